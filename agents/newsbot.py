@@ -20,24 +20,48 @@ import asyncio
 import requests
 import time
 import json
+from dataclasses import replace
 from pathlib import Path
 from threading import Thread
 from fastapi import Depends
-from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from agents.utils.news_trackers import NewsTrackerService
+from agents.utils.crawl_cursors import CrawlCursorService
 from src.core.genai.text_summarize import Summarizer
-from src.core.genai.tts_piper import PiperTextToSpeech
+from src.core.genai.nltk_resources import NLTK_RESOURCES
+from src.core.genai.tts_piper import PiperTextToSpeech, wav_seconds
 from src.core.genai.atv_ffmpeg import VideoGenerator
 
 from src.plugins.scrapers.sites.ndtv import NdtvLatestScraper, NdtvNewsScraper, NdtvSportsScraper
-from src.plugins.pipeline_xcavator import BaseTask, Pipeline as PipelineManager
-from src.datasource.sqlite import get_db_v2 as get_db
+from src.plugins.scrapers.http_client import HTTP_CLIENTS
+from src.plugins.scrapers.http_cache import default_http_cache
+from src.plugins.scrapers.parsing import PARSE_STATS
+from src.plugins.pipeline_xcavator import BaseTask, Pipeline as PipelineManager, PipelineModes, PipelineSkipped, RetryPolicy
+from src.plugins.near_duplicates import MinHashIndex
+from src.plugins.pipeline_checkpoints import CheckpointStore
+from src.plugins.stage_executor import Stage, StageExecutor
+from src.plugins.task_executors import TaskExecutors, WorkTypes
+from src.plugins.artifact_cache import ArtifactCache
+from src.plugins.run_history import RunHistory
+from src.plugins.resource_pools import PoolSpec, ResourcePools
+from src.datasource.sqlite import db_session
+from src.core.models.posts import PostQueueStages
+from src.core.queue.post_queue import PostQueueEngine
+from src.core.queue.worker import PostWorker
 from src.datasource.sqlalchemy.model_base import create_tables
 
+# youtube shorts stop at 60s; the reel is exactly as long as its narration
+REEL_MAX_SECONDS = float(os.getenv("NEWSBOT_REEL_MAX_SECONDS", "58"))
+
 
 class NewsScrapperTask(BaseTask):
+    reads = ()
+    writes = ("article", "url", "tags")
+    work_type = WorkTypes.io
+    stage = "scrape"
+    resource = "http"
+    policy = RetryPolicy(max_attempts=3, backoff=5, timeout=30)
 
     def __init__(self, name: str, url: str):
         super().__init__(name)
@@ -49,7 +73,10 @@ class NewsScrapperTask(BaseTask):
         if "sports.ndtv" in self.url:
             service = NdtvSportsScraper()
 
-        article = service.run(self.url)
+        # fetched on the shared async client; the connection to ndtv stays warm between articles
+        article = await service.arun(self.url)
+        if not article:
+            raise RuntimeError(f"could not scrape {self.url}")
         xcom["article"] = article
         xcom["url"] = self.url
         xcom["tags"] = xcom.get("tags", ["#news"])
@@ -58,73 +85,234 @@ class NewsScrapperTask(BaseTask):
             xcom["tags"].append("#sports")
 
 
+class DuplicateCheckTask(BaseTask):
+    """Stops the pipeline when the story was already taken under another url,
+    before anything is summarized, voiced or rendered."""
+    reads = ("article", "url")
+    writes = ("story_checked",)
+    work_type = WorkTypes.io  # the index lives in this process, keep it off the process pool
+    stage = "dedup"
+
+    def __init__(self, name: str, index: MinHashIndex, tenant_ids: list[str]):
+        super().__init__(name)
+        self.index = index
+        self.tenant_ids = tenant_ids
+
+    async def run(self, xcom: dict[str, any]) -> any:
+        article = xcom.get("article", {})
+        body = article.get("article_text", "")
+        text = f"{article.get('headline', '')} {' '.join(body) if isinstance(body, list) else body}"
+        duplicate = await self.offload(self.index.add, xcom["url"], text, title=self.name)
+        if duplicate:
+            # tracked as processed so the duplicate url is not offered again
+            for tenant_id in self.tenant_ids:
+                await self.offload(on_complete, tenant_id, xcom["url"])
+            raise PipelineSkipped(f"near duplicate of {duplicate[0]} (similarity {duplicate[1]:.2f})")
+        xcom["story_checked"] = True
+
+    async def rollback(self, xcom: dict):
+        # a story whose pipeline failed may still be taken under another url
+        await self.offload(self.index.remove, xcom.get("url"))
+
+
+class ImageCanvasTask(BaseTask):
+    reads = ("article", "story_checked")
+    writes = ("canvas",)
+    work_type = WorkTypes.io
+    stage = "canvas"
+    policy = RetryPolicy(max_attempts=2, backoff=5, timeout=60)
+
+    async def run(self, xcom: dict[str, any]) -> any:
+        print("image canvas task: ", self.name)
+        media = xcom.get("article").get("media")
+        # downloads the article image and embeds it on the reel canvas
+        service = await self.offload(VideoGenerator, image_path=media, reel=True)
+        xcom["canvas"] = service.image_path
+
+    def checkpoint_valid(self, outputs: dict) -> bool:
+        return _path_exists(outputs.get("canvas"))
+
+
 class TextSummarization(BaseTask):
+    reads = ("article", "story_checked")
+    writes = ("article_summarized",)
+    work_type = WorkTypes.cpu
+    stage = "summarize"
+    resource = "summarizer"
+    policy = RetryPolicy(timeout=120)
+    cacheable = True
+    engine_version = "summarizer-tf:6"
+
+    def cache_inputs(self, xcom: dict) -> dict:
+        rate = PiperTextToSpeech().rate
+        return {"article_text": xcom.get("article", {}).get("article_text", ""),
+                "max_seconds": REEL_MAX_SECONDS,
+                "speech_rate": [rate.words_per_second, rate.sentence_pause]}
 
     async def run(self, xcom: dict[str, any]) -> any:
         print("text-summarize task: ", self.name)
-        service = Summarizer(6)
+        # only as many top sentences as the voice can speak within a reel
+        service = Summarizer(6, max_seconds=REEL_MAX_SECONDS, duration=PiperTextToSpeech().rate.seconds)
         article = xcom.get("article", {}).get("article_text", "")
         text = ' '.join(article) if isinstance(article, list) else article
-        summary = service.generate(text)
+        summary = await self.offload(service.generate, text)
         xcom["article_summarized"] = summary
 
 
 class AudioGen(BaseTask):
+    reads = ("article_summarized", "url")
+    writes = ("audio",)
+    work_type = WorkTypes.subprocess
+    stage = "tts"
+    resource = "piper"
+    cacheable = True
+    engine_version = "piper:en_US-ryan-high:chunked"
+    policy = RetryPolicy(max_attempts=2, backoff=5, timeout=180)
+    artifact_keys = ("audio",)
+
+    def __init__(self, name: str, tenant_ids: list[str] = ()):
+        super().__init__(name)
+        self.tenant_ids = list(tenant_ids)
+
+    def cache_inputs(self, xcom: dict) -> dict:
+        # the url is only read to track a skip, the same summary voices the same anywhere
+        return {"article_summarized": xcom.get("article_summarized")}
+
+    async def _skip(self, url: str, reason: str):
+        # tracked as processed so the story is not queued, and voiced, again next cycle
+        for tenant_id in self.tenant_ids:
+            await self.offload(on_complete, tenant_id, url)
+        raise PipelineSkipped(reason)
 
     async def run(self, xcom: dict[str, any]) -> any:
         print("Audio upload task: ", self.name)
-        service = PiperTextToSpeech()
+        service = PiperTextToSpeech().pooled()  # long-lived piper workers, sized by NewsProcessor
         summary = xcom.get("article_summarized")
-        if summary and len(summary) > 150:
-            audio = service.generate(summary)
-            xcom["audio"] = audio
-        else:
+        if not summary or len(summary) <= 150:
             print(f"{self.name} has low summery, skipping")
+            return
+        estimate = service.rate.seconds(summary)
+        if estimate > REEL_MAX_SECONDS:
+            await self._skip(xcom["url"], f"summary would run {estimate:.0f}s, "
+                                          f"over the {REEL_MAX_SECONDS:.0f}s reel limit")
+        # sentences are voiced in parallel across the piper workers and joined in order
+        audio = await service.agenerate_chunked(summary, self.run_subprocess)
+        spoken = wav_seconds(audio)  # header read only
+        if spoken > REEL_MAX_SECONDS:
+            # the voice is slower than its rate says, `python -m src.core.genai.tts_piper` calibrates it
+            os.remove(audio)
+            await self._skip(xcom["url"], f"narration is {spoken:.0f}s (estimated {estimate:.0f}s), "
+                                          f"over the {REEL_MAX_SECONDS:.0f}s reel limit")
+        xcom["audio"] = audio
+
+    def checkpoint_valid(self, outputs: dict) -> bool:
+        return "audio" not in outputs or _path_exists(outputs.get("audio"))
 
 
 class VideoGen(BaseTask):
+    reads = ("canvas", "audio")
+    writes = ("video",)
+    work_type = WorkTypes.subprocess
+    stage = "render"
+    resource = "ffmpeg"
+    cacheable = True
+    engine_version = "ffmpeg:reel-608x1080"
+    policy = RetryPolicy(max_attempts=2, backoff=10, timeout=600)
+    artifact_keys = ("video",)
 
     async def run(self, xcom: dict) -> any:
         print("Video upload task: ", self.name)
-        media = xcom.get("article").get("media")
-        service = VideoGenerator(image_path=media, reel=True)
+        service = VideoGenerator(image_path=xcom.get("canvas"), reel=True, prepared=True)
         audio = xcom.get("audio")
 
-        video_path = service.generate(audio)
+        video_path = await service.agenerate(audio, self.run_subprocess)
         xcom["video"] = video_path
 
+    def checkpoint_valid(self, outputs: dict) -> bool:
+        return outputs.get("video") is None or _path_exists(outputs.get("video"))
 
-class YouTubeUploadTask(BaseTask):
+    def cache_hit(self, xcom: dict):
+        # a real render consumes its inputs, so drop them on a cached one as well
+        for key in ("audio", "canvas"):
+            if _path_exists(xcom.get(key)):
+                os.remove(xcom.get(key))
 
-    def __init__(self, name: str, tenant_id: str, on_complete: any):
-        super().__init__(name)
+
+class UploadTransports:
+    inprocess = "inprocess"  # call the platform sdk from this process, through a post_queue row
+    queue = "queue"  # insert into post_queue and wait for a post worker
+    http = "http"  # loopback through the api, which queues it
+
+
+class YouTubeUploadTask(BaseTask):
+    reads = ("video", "article_summarized", "url", "tags")
+    work_type = WorkTypes.io
+    stage = "upload"
+    resource = "upload"
+    # never retried: a retry after a slow but successful upload would post twice
+    policy = RetryPolicy(timeout=900)
+    irreversible = True  # a failed tracker must not make the next run post again
+    isolated = True  # one tenant's failed upload leaves the other tenants' uploads alone
+    api_url = os.getenv("NEWSBOT_API_URL", "http://127.0.0.1:8081")
+
+    def __init__(self, name: str, tenant_id: str, on_complete: any = None,
+                 transport: str = UploadTransports.inprocess):
+        # one upload per tenant shares the rendered video, so outputs are tenant scoped
+        super().__init__(name, writes=(uploaded_key(tenant_id),))
         self.tenant_id = tenant_id
         self.on_complete = on_complete
+        self.transport = transport
+
+    @property
+    def checkpoint_key(self) -> str:
+        return f"{type(self).__name__}:{self.tenant_id}"
+
+    async def _upload_queued(self, payload: dict, local: bool = False) -> str:
+        """Queue the post directly and wait until it is finished, by a post worker
+        or, when local, by publishing the row from this process."""
+        engine = PostQueueEngine()
+        worker = PostWorker(engine) if local else None
+        record = await self.offload(engine.enqueue, self.tenant_id, payload,
+                                    dedupe_key=payload.get("dedupe_key"))
+        print(f"{self.name}: upload queued as {record.id}")
+        while record.status == PostQueueStages.processing:
+            # a cancelled attempt's thread keeps the lease and finishes the row on its own
+            if not (worker and await self.offload(worker.run_once, record.id)):
+                await asyncio.sleep(5)
+            record = await self.offload(engine.get, str(record.id), self.tenant_id)
+        if record.status != PostQueueStages.completed:
+            logs = await self.offload(engine.logs, str(record.id))
+            raise RuntimeError(f"{self.name}: upload failed: {[log.message for log in logs]}")
+        return str(record.id)
 
     async def _upload_video(self, url: str, payload: dict,
-                            headers: dict) -> None:
-        """Helper method to perform the upload in a separate thread."""
-        try:
-            response = requests.post(url,
-                                     json=payload,
-                                     headers=headers,
-                                     timeout=10)  # Set a timeout
-            if response.status_code == 200:
-                print(
-                    f"{self.name}: Successfully uploaded video. Response: {response.json()}"
-                )
-            else:
-                print(
-                    f"{self.name}: Upload failed with status {response.status_code}"
-                )
-
-        except Exception as e:
-            print(
-                f"{self.name}: Upload encountered an error: {e} (continuing anyway)"
-            )
+                            headers: dict) -> str:
+        """Queue the post on the api, then long poll until a post worker finishes it."""
+        response = await self.offload(requests.post,
+                                      url,
+                                      json=payload,
+                                      headers=headers,
+                                      timeout=10)
+        response.raise_for_status()
+        queue_id = response.json()["queue_id"]
+        print(f"{self.name}: upload queued as {queue_id}")
+
+        while True:
+            response = await self.offload(requests.get,
+                                          f"{url.split('?')[0]}/{queue_id}",
+                                          params={"wait": 30, "tenant_id": self.tenant_id},
+                                          headers=headers,
+                                          timeout=45)
+            response.raise_for_status()
+            status = response.json()["data"]
+            if status["status"] == "completed":
+                print(f"{self.name}: Successfully uploaded video. Logs: {status['logs']}")
+                return queue_id
+            if status["status"] == "failed":
+                raise RuntimeError(f"{self.name}: upload failed: {status['logs']}")
 
     async def run(self, xcom: dict):
-        print("Youtube upload task: ", self.name)
+        print("Youtube upload task: ", self.name, self.transport)
         video_path = xcom.get("video")
         article = xcom.get("article_summarized")
         article_source = xcom.get(
@@ -141,24 +329,27 @@ class YouTubeUploadTask(BaseTask):
         else:
             article = "News Testing"  # Fallback if article or source is missing
 
-        url = f"http://127.0.0.1:8081/tenants/socials/post?tenant_id={self.tenant_id}"
-        headers = {
-            "accept": "application/json",
-            "Content-Type": "application/json"
-        }
         payload = {
             "post_body": article,
             "medias": [video_path],
             "platform": "youtube"
         }
+        # a rerun after a timeout picks up the queued upload instead of posting again
+        payload["dedupe_key"] = f"youtube:{article_source or video_path}"
+        if self.transport == UploadTransports.http:
+            url = f"{self.api_url}/tenants/socials/post?tenant_id={self.tenant_id}"
+            headers = {
+                "accept": "application/json",
+                "Content-Type": "application/json"
+            }
+            uploaded = await self._upload_video(url, payload, headers)
+        else:
+            uploaded = await self._upload_queued(payload, local=self.transport == UploadTransports.inprocess)
 
-        # Fire and forget: Run the upload in a separate thread
-        await self._upload_video(url, payload, headers)
+        xcom[uploaded_key(self.tenant_id)] = uploaded
         if self.on_complete:
             self.on_complete()
 
-        print(f"{self.name}: Upload initiated in background thread")
-
 
 """
 if __name__ == "__main__":
@@ -187,21 +378,105 @@ if __name__ == "__main__":
 """
 
 
+class TrackerTask(BaseTask):
+    """Records the article as processed; checkpointed apart from the upload so a
+    crash between the two never causes a second upload."""
+    writes = ()
+    work_type = WorkTypes.io
+    stage = "track"
+    policy = RetryPolicy(max_attempts=3, backoff=2)
+    isolated = True
+
+    def __init__(self, name: str, tenant_id: str, url: str):
+        super().__init__(name, reads=(uploaded_key(tenant_id),))
+        self.tenant_id = tenant_id
+        self.url = url
+
+    @property
+    def checkpoint_key(self) -> str:
+        return f"{type(self).__name__}:{self.tenant_id}"
+
+    async def run(self, xcom: dict):
+        if not xcom.get(uploaded_key(self.tenant_id)):
+            print(f"{self.name}: nothing uploaded, not tracking")
+            return
+        await self.offload(on_complete, self.tenant_id, self.url)
+
+
+def uploaded_key(tenant_id: str) -> str:
+    return f"uploaded:{tenant_id}"
+
+
+def _path_exists(path: any) -> bool:
+    return isinstance(path, str) and os.path.exists(path)
+
+
 def on_complete(tenant_id: str, url: str):
-    db = next(get_db())
-    news_tracker_service = NewsTrackerService(db=db)
-    data = news_tracker_service._prepare(tenant_id, url)
-    news_tracker_service.create(data)
+    with db_session() as db:
+        news_tracker_service = NewsTrackerService(db=db)
+        if news_tracker_service.find_record(tenant_id, url):
+            return
+        data = news_tracker_service._prepare(tenant_id, url)
+        news_tracker_service.create(data)
+
+def news_pools(limits: dict[str, int] = None) -> ResourcePools:
+    """Slots of each scarce resource the news tasks hold, clamped to this host."""
+    cpus = os.cpu_count() or 1
+    specs = {
+        "http": PoolSpec(16, memory_mb=20),
+        "summarizer": PoolSpec(2, cpus=1, memory_mb=300),
+        "piper": PoolSpec(2, cpus=1, memory_mb=500),
+        "ffmpeg": PoolSpec(max(1, cpus // 3), cpus=3, memory_mb=400),  # one encode per few cores
+        "upload": PoolSpec(2, memory_mb=100),
+    }
+    for name, limit in (limits or {}).items():
+        specs[name] = replace(specs.get(name, PoolSpec(limit)), limit=limit)
+    return ResourcePools(specs)
+
+
+def news_stages(workers: dict[str, int] = None) -> list[Stage]:
+    """scrape -> summarize -> tts -> render -> upload, with per-stage worker counts."""
+    workers = {"scrape": 4, "summarize": 2, "tts": 1, "render": 1, "upload": 2, **(workers or {})}
+    return [
+        Stage("scrape", (NewsScrapperTask, DuplicateCheckTask, ImageCanvasTask), workers["scrape"]),
+        Stage("summarize", (TextSummarization,), workers["summarize"]),
+        Stage("tts", (AudioGen,), workers["tts"]),
+        Stage("render", (VideoGen,), workers["render"]),
+        Stage("upload", (YouTubeUploadTask, TrackerTask), workers["upload"]),
+    ]
+
 
 class NewsProcessor:
-    def __init__(self, tenant_id: str, batch_size: int = 20, fetch_interval: int = 980, max_concurrent: int = 2):
-        self.tenant_id = tenant_id
-        self.batch_size = batch_size
+    def __init__(self, tenant_ids: list[str] | str, batch_size: int = 20, fetch_interval: int = 980, max_concurrent: int = 2,
+                 stage_workers: dict[str, int] = None, executors: TaskExecutors = None,
+                 pipeline_deadline: int = 1800, upload_transport: str = UploadTransports.inprocess,
+                 pool_limits: dict[str, int] = None, backfill_pages: int = 5):
+        # every story is scraped, summarized, voiced and rendered once, then uploaded per tenant
+        self.tenant_ids = [tenant_ids] if isinstance(tenant_ids, str) else list(tenant_ids)
+        # when set, batches run through the stage executor instead of whole pipelines
+        self.stage_workers = stage_workers
+        self.batch_size = batch_size  # only used to size stage executor batches
         self.fetch_interval = fetch_interval
-        self.max_concurrent = max_concurrent  # Limit to 2 concurrent tasks
+        self.max_concurrent = max_concurrent  # Pipelines kept in flight at once
+        self.pipeline_deadline = pipeline_deadline  # Seconds a single article may take end to end
+        self.upload_transport = upload_transport
         self.pipeline_managers: list[PipelineManager] = []
+        self.in_flight: set[asyncio.Task] = set()
         self.last_fetch_time = 0
-        self.executor = ThreadPoolExecutor(max_workers=max_concurrent)
+        self.checkpoints = CheckpointStore()
+        # per resource limits on top of max_concurrent, see news_pools
+        self.pools = news_pools(pool_limits)
+        # io threads, cpu processes and subprocess slots shared by every pipeline; the
+        # piper and ffmpeg pools decide how many binaries run, not the subprocess slots
+        self.executors = executors or TaskExecutors(
+            io_workers=8, subprocess_limit=self.pools.limits["piper"] + self.pools.limits["ffmpeg"])
+        self.cache = ArtifactCache()
+        self.history = RunHistory()
+        # one loaded voice model per piper slot, reused by every AudioGen
+        self.tts = PiperTextToSpeech().pooled(size=self.pools.limits["piper"])
+        self.duplicates = MinHashIndex()  # stories already taken, across urls
+        self.crawl_source = "ndtv:latest"
+        self.backfill_pages = backfill_pages  # latest pages walked back to the last seen url
         self.running = True
 
     async def fetch_and_queue_articles(self):
@@ -211,68 +486,92 @@ class NewsProcessor:
             return
 
         print("Fetching latest news...")
-        latest_news = NdtvLatestScraper().run("https://www.ndtv.com/latest#pfrom=home-ndtv_mainnavigation")
+        with db_session() as db:
+            seen = CrawlCursorService(db=db).seen(self.crawl_source)
+        # without a cursor there is nothing to catch up on, the first page is enough
+        latest_news = await NdtvLatestScraper().acrawl(seen, self.backfill_pages if seen else 1)
+        latest_news = [article for article in latest_news if article.get("link")]
+
+        # One lookup per tenant for the whole page instead of a query per link
+        links = [article["link"] for article in latest_news]
+        with db_session() as db:
+            service = NewsTrackerService(db=db)
+            processed = {tenant_id: service.find_processed(tenant_id, links) for tenant_id in self.tenant_ids}
+            CrawlCursorService(db=db).advance(self.crawl_source, links)
+
         for article in latest_news:
-            link = article.get("link")
-            if not link:
+            link = article["link"]
+            tenants = [tenant_id for tenant_id in self.tenant_ids if link not in processed[tenant_id]]
+            if not tenants:
                 continue
 
-            news_tracker_service = NewsTrackerService(db=next(get_db()))
-            # Check if already processed once per fetch cycle
-            if news_tracker_service.find_record(self.tenant_id, link):
-                print("already processed; ", link)
-                continue  # Skip silently without repeated messages
-
-            print(f"Queueing new article: {article['title']}")
-            h_manager = PipelineManager()
+            print(f"Queueing new article for {len(tenants)} tenant(s): {article['title']}")
+            h_manager = PipelineManager(mode=PipelineModes.dag,
+                                        pipeline_id=link,
+                                        checkpoints=self.checkpoints,
+                                        executors=self.executors,
+                                        cache=self.cache,
+                                        deadline=self.pipeline_deadline,
+                                        history=self.history,
+                                        pools=self.pools)
             h_manager.add_task(NewsScrapperTask(article["title"], link))
+            h_manager.add_task(DuplicateCheckTask(article["title"], self.duplicates, tenants))
+            h_manager.add_task(ImageCanvasTask(article["title"]))
             h_manager.add_task(TextSummarization(article["title"]))
-            h_manager.add_task(AudioGen(article["title"]))
+            h_manager.add_task(AudioGen(article["title"], tenants))
             h_manager.add_task(VideoGen(article["title"]))
-            h_manager.add_task(
-                YouTubeUploadTask(
-                    article["title"],
-                    tenant_id=self.tenant_id,
-                    on_complete=lambda t=self.tenant_id, u=link: on_complete(t, u)
-                )
-            )
+            for tenant_id in tenants:
+                h_manager.add_task(YouTubeUploadTask(article["title"], tenant_id=tenant_id,
+                                                     transport=self.upload_transport))
+                h_manager.add_task(TrackerTask(article["title"], tenant_id=tenant_id, url=link))
             self.pipeline_managers.append(h_manager)
 
         self.last_fetch_time = time.time()
 
-    def run_pipeline_sequentially(self, pipeline: PipelineManager) -> None:
-        """Run a single pipeline synchronously in a thread."""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    async def run_pipeline(self, pipeline: PipelineManager) -> None:
+        """Run a single pipeline on the shared event loop."""
         try:
-            loop.run_until_complete(pipeline.run())
-            print(f"Completed pipeline for {pipeline.tasks[0].name}")
+            result = await pipeline.run()
+            print(f"Pipeline for {pipeline.tasks[0].name}: {result.status} in {result.elapsed:.0f}s, "
+                  f"{result.retries} retries, {result.timeouts} timeouts")
         except Exception as e:
             print(f"Error in pipeline {pipeline.tasks[0].name}: {e}")
-        finally:
-            loop.close()
 
     async def process_articles(self):
-        """Process queued articles with controlled concurrency."""
-        while self.pipeline_managers and self.running:
-            # Take a batch up to batch_size
-            batch = self.pipeline_managers[:self.batch_size]
-            del self.pipeline_managers[:self.batch_size]
+        """Process queued articles, refilling a slot as soon as any pipeline finishes."""
+        if self.stage_workers is not None:
+            while self.pipeline_managers and self.running:
+                batch = self.pipeline_managers[:self.batch_size]
+                del self.pipeline_managers[:self.batch_size]
+                await StageExecutor(news_stages(self.stage_workers)).run(batch)
+                print(f"Processed batch of {len(batch)} articles")
+            return
 
-            # Submit tasks to executor, respecting max_concurrent
-            futures = []
-            for manager in batch:
-                future = self.executor.submit(self.run_pipeline_sequentially, manager)
-                futures.append(future)
+        processed = 0
+        while self.pipeline_managers or self.in_flight:
+            while self.running and self.pipeline_managers and len(self.in_flight) < self.max_concurrent:
+                pipeline = self.pipeline_managers.pop(0)
+                self.in_flight.add(asyncio.create_task(self.run_pipeline(pipeline)))
+            if not self.in_flight:
+                break
 
-            # Wait for all tasks in the batch to complete
-            for future in futures:
-                future.result()  # Blocks until the task is done
+            done, self.in_flight = await asyncio.wait(self.in_flight, return_when=asyncio.FIRST_COMPLETED)
+            processed += len(done)
 
-            print(f"Processed batch of {len(batch)} articles")
+        print(f"Processed {processed} articles, artifact cache: {self.cache.stats()}")
+        print(f"Resource pools: {self.pools.stats()}")
+        print(f"HTTP cache: {default_http_cache().stats()}")
+        print(f"Parse times: {PARSE_STATS.stats()}")
 
     async def run(self):
         """Main loop with fetch-process-wait cycle."""
+        with db_session() as db:
+            for tenant_id in self.tenant_ids:
+                NewsTrackerService(db=db).warm_index(tenant_id)
+        # loads the voice in every worker now instead of in the first stories
+        for worker in await asyncio.to_thread(self.tts.pool.health_check):
+            print(f"piper worker {worker['worker']}: {'healthy' if worker['healthy'] else 'UNHEALTHY'} "
+                  f"in {worker.get('probe_ms')} ms")
         while self.running:
             await self.fetch_and_queue_articles()
 
@@ -290,14 +589,20 @@ class NewsProcessor:
     def shutdown(self):
         """Gracefully shut down the processor."""
         self.running = False
-        self.executor.shutdown(wait=True)
+        for task in self.in_flight:
+            task.cancel()
+        self.executors.shutdown(wait=False)
+        HTTP_CLIENTS.close()
+        self.tts.pool.close()
         print("Shutdown complete")
 
 
 if __name__ == "__main__":
     create_tables()
-    tenant_id = "35e1f3aa-1c51-40cb-acb9-88f604078fd7"
-    news_processor = NewsProcessor(tenant_id)
+    NLTK_RESOURCES.require()  # fail at start, not in the first summarize task
+    tenant_ids = os.getenv("NEWSBOT_TENANTS", "35e1f3aa-1c51-40cb-acb9-88f604078fd7").split(",")
+    news_processor = NewsProcessor([tenant_id.strip() for tenant_id in tenant_ids if tenant_id.strip()],
+                                   upload_transport=os.getenv("NEWSBOT_UPLOAD_TRANSPORT", UploadTransports.inprocess))
     try:
         asyncio.run(news_processor.run())
     except KeyboardInterrupt:
@@ -0,0 +1,44 @@
+import sys
+import os
+import argparse
+import multiprocessing
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.queue.post_queue import PostQueueEngine
+from src.core.queue.worker import PostWorker
+from src.datasource.sqlalchemy.model_base import create_tables
+
+
+def run_worker(index: int, lease_seconds: int, poll_interval: float):
+    engine = PostQueueEngine(lease_seconds=lease_seconds)
+    worker = PostWorker(engine=engine, poll_interval=poll_interval)
+    print(f"post worker {index} started as {worker.worker_id}")
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process the post_queue with N worker processes")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--lease-seconds", type=int, default=300)
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    create_tables()
+    processes = [
+        multiprocessing.Process(target=run_worker,
+                                args=(index, args.lease_seconds, args.poll_interval),
+                                name=f"post-worker-{index}")
+        for index in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        print("Shutting down workers...")
+        for process in processes:
+            process.terminate()
@@ -0,0 +1,35 @@
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional, Set
+from src.datasource.sqlalchemy.repo import BaseRepository
+from src.core.models.trackers import CrawlCursors
+
+
+class CrawlCursorService:
+    """Reads and advances the per source high-water mark of the latest-news crawl."""
+
+    def __init__(self, db: Session, keep: int = 300):
+        self.db = db
+        self.repository = BaseRepository(CrawlCursors, db)
+        self.keep = keep  # urls remembered per source, a few listing pages worth
+
+    def find(self, source: str) -> Optional[CrawlCursors]:
+        return self.repository.db.query(CrawlCursors).filter(
+            CrawlCursors.source == source).first()
+
+    def seen(self, source: str) -> Set[str]:
+        cursor = self.find(source)
+        return set(cursor.seen_urls or []) if cursor else set()
+
+    def advance(self, source: str, urls: Iterable[str]) -> CrawlCursors:
+        """Record urls from a crawl, newest first, ahead of the ones seen before."""
+        urls = [url for url in urls if url]
+        cursor = self.find(source)
+        if cursor is None:
+            cursor = CrawlCursors(source=source, seen_urls=[])
+            self.db.add(cursor)
+        merged = list(dict.fromkeys([*urls, *(cursor.seen_urls or [])]))[:self.keep]
+        cursor.seen_urls = merged
+        cursor.high_water_url = merged[0] if merged else None
+        self.db.commit()
+        self.db.refresh(cursor)
+        return cursor
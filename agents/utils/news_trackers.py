@@ -1,12 +1,46 @@
+import threading
 from sqlalchemy.orm import Session, joinedload, aliased, selectinload
-from sqlalchemy import desc
+from sqlalchemy import desc, event
 from uuid import UUID, uuid4
 from src.datasource.sqlalchemy.repo import BaseRepository
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, Iterable, Set
 from src.core.models.trackers import Trackers
 
 
+class ProcessedUrlIndex:
+    """Per-tenant hash set of processed urls, warmed from trackers once and kept
+    current by the trackers insert listener below."""
+
+    def __init__(self):
+        self._urls: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def is_warm(self, tenant_id: str) -> bool:
+        return str(UUID(tenant_id)) in self._urls
+
+    def warm(self, tenant_id: str, urls: Iterable[str]):
+        with self._lock:
+            self._urls.setdefault(str(UUID(tenant_id)), set()).update(urls)
+
+    def add(self, tenant_id: str, url: str):
+        with self._lock:
+            self._urls.setdefault(str(UUID(tenant_id)), set()).add(url)
+
+    def known(self, tenant_id: str, urls: Iterable[str]) -> Set[str]:
+        with self._lock:
+            processed = self._urls.get(str(UUID(tenant_id)), set())
+            return {url for url in urls if url in processed}
+
+
+PROCESSED_URLS = ProcessedUrlIndex()
+
+
+@event.listens_for(Trackers, 'after_insert')
+def index_processed_url(mapper, connection, target):
+    PROCESSED_URLS.add(str(target.tenant_id), target.url)
+
+
 class NewsTrackerService:
 
     def __init__(self, db: Session):
@@ -19,6 +53,35 @@ class NewsTrackerService:
     def create(self, record: Trackers) -> Trackers:
         return self.repository.create(record)
 
+    def processed_urls(self, tenant_id: str) -> Set[str]:
+        rows = self.repository.db.query(Trackers.url).filter(
+            Trackers.tenant_id == UUID(tenant_id)).all()
+        return {url for url, in rows}
+
+    def warm_index(self, tenant_id: str):
+        """Load every url of the tenant into the in-memory index."""
+        PROCESSED_URLS.warm(tenant_id, self.processed_urls(tenant_id))
+
+    def find_processed(self, tenant_id: str, urls: Iterable[str]) -> Set[str]:
+        """Subset of urls the tenant already processed, in at most one query.
+
+        The in-memory index answers what it knows; only the remaining urls hit
+        the database, which covers trackers written by other processes.
+        """
+        urls = set(urls)
+        if not PROCESSED_URLS.is_warm(tenant_id):
+            self.warm_index(tenant_id)
+        processed = PROCESSED_URLS.known(tenant_id, urls)
+        unknown = urls - processed
+        if unknown:
+            rows = self.repository.db.query(Trackers.url).filter(
+                Trackers.tenant_id == UUID(tenant_id),
+                Trackers.url.in_(unknown)).all()
+            found = {url for url, in rows}
+            PROCESSED_URLS.warm(tenant_id, found)
+            processed |= found
+        return processed
+
     def find_record(self, tenant_id: str, url: str):
         return self.repository.db.query(Trackers).filter(
             Trackers.tenant_id == UUID(tenant_id),
@@ -1,3 +1,4 @@
+import os
 import uvicorn
 from contextlib import asynccontextmanager
 from starlette.responses import JSONResponse
@@ -7,6 +8,7 @@ from src.resources import routes
 from src.datasource.sqlalchemy.model_base import create_tables
 from src.plugins.webplugs.manager import PLUGIN_MANAGER
 from src.plugins.middlewares import PluginExecutorMiddleware, LoggerMiddleware 
+from src.core.queue.worker import start_post_workers
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
@@ -14,8 +16,13 @@ async def lifespan(_app: FastAPI):
     print("[+] plugins loading completed.")
     create_tables()  # Run the function on startup
     print("[+] sqlalchemy tables init/sync completed.")
+    # set POST_QUEUE_WORKERS=0 when agents/post_worker.py drains the queue instead
+    post_workers = start_post_workers(int(os.getenv("POST_QUEUE_WORKERS", "1")))
+    print(f"[+] {len(post_workers)} post queue worker(s) started.")
     yield  # Allows the app to continue running
     print("shutting down...")
+    for worker in post_workers:
+        worker.stop()
 
 
 app = FastAPI(title="Real Estate", lifespan=lifespan)
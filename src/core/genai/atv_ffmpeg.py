@@ -1,23 +1,36 @@
+import asyncio
 import os
 import subprocess
 import base64
+import uuid
 from PIL import Image, ImageDraw
 import requests
 from urllib.parse import urlparse
 
 
+def _temp_path(suffix: str = ".png") -> str:
+    # one file per canvas, pipelines running side by side never share one
+    return f"/tmp/{uuid.uuid4()}{suffix}"
+
+
 class VideoGenerator:
 
-    def __init__(self, image_path=None, reel=True):
+    def __init__(self, image_path=None, reel=True, prepared=False):
         """
         Initialize with optional image path and reel flag.
         Reel mode uses 9:16 aspect ratio (608x1080).
+        Pass prepared=True when image_path is already a canvas from a previous instance.
         """
         self.reel = reel
         self.video_resolution = (608, 1080) if reel else None
-        self.image_path = self.process_image(image_path)
+        self.created = set()  # files this generator owns and cleanup may remove
+        if prepared and isinstance(image_path, str) and os.path.exists(image_path):
+            self.image_path = image_path
+            self.created.add(image_path)  # handed over by the instance that made it
+        else:
+            self.image_path = self.process_image(image_path)
         if not self.image_path:  # Ensure we always have a valid path
-            self.image_path = self.create_blank_image("/tmp/blank_image.png")
+            self.image_path = self.create_blank_image(_temp_path())
 
     def process_image(self, image_path):
         """Process the input image based on its source and validity"""
@@ -55,10 +68,14 @@ class VideoGenerator:
         try:
             header, base64_data = image_path.split(",", 1)
             image_data = base64.b64decode(base64_data)
-            temp_path = "/tmp/base64_image.png"
+            temp_path = _temp_path()
             with open(temp_path, "wb") as img_file:
                 img_file.write(image_data)
-            return self.prepare_local_image(temp_path)
+            self.created.add(temp_path)
+            prepared = self.prepare_local_image(temp_path)
+            if prepared != temp_path:
+                self._remove(temp_path)
+            return prepared
         except Exception:
             return None
 
@@ -67,7 +84,7 @@ class VideoGenerator:
         try:
             image = Image.open(image_path)
             if self.reel:
-                return self.embed_image_on_canvas(image, "/tmp/reel_image.png",
+                return self.embed_image_on_canvas(image, _temp_path(),
                                                   (608, 1080))
             return image_path
         except Exception:
@@ -82,6 +99,7 @@ class VideoGenerator:
             y_offset = (resolution[1] - image.height) // 2
             canvas.paste(image, (x_offset, y_offset))
             canvas.save(output_path)
+            self.created.add(output_path)
             return output_path
         except Exception:
             return None
@@ -91,18 +109,18 @@ class VideoGenerator:
         try:
             response = requests.get(image_url, stream=True)
             response.raise_for_status()
-            filename = os.path.basename(
-                urlparse(image_url).path) or "downloaded_image.png"
-            local_path = os.path.join("/tmp", filename)
+            local_path = _temp_path(os.path.splitext(urlparse(image_url).path)[1] or ".png")
 
             with open(local_path, 'wb') as img_file:
+                self.created.add(local_path)
                 for chunk in response.iter_content(chunk_size=8192):
                     img_file.write(chunk)
 
             image = Image.open(local_path)
             if self.reel:
-                return self.embed_image_on_canvas(image, local_path,
-                                                  (608, 1080))
+                canvas = self.embed_image_on_canvas(image, _temp_path(), (608, 1080))
+                self._remove(local_path)
+                return canvas
             return local_path
         except Exception:
             return None
@@ -116,10 +134,11 @@ class VideoGenerator:
                   "Blank Frame",
                   fill="white")
         image.save(output_path)
+        self.created.add(output_path)
         return output_path
 
-    def generate(self, audio_path: str):
-        """Generate video with the processed image and audio"""
+    def build_command(self, audio_path: str):
+        """Validate inputs and return the ffmpeg command and output path, or None"""
         if not isinstance(audio_path, str) or not os.path.exists(audio_path):
             print("Invalid or missing audio file")
             return None
@@ -131,16 +150,40 @@ class VideoGenerator:
         # Ensure we have a valid image path
         if not isinstance(self.image_path, str) or not os.path.exists(
                 self.image_path):
-            self.image_path = self.create_blank_image("/tmp/blank_image.png")
+            self.image_path = self.create_blank_image(_temp_path())
 
         resolution = (608,
                       1080) if self.reel else Image.open(self.image_path).size
         command = [
-            "ffmpeg", "-loop", "1", "-i", self.image_path, "-i", audio_path,
+            "ffmpeg", "-y", "-loop", "1", "-i", self.image_path, "-i", audio_path,
             "-vf", f"scale={resolution[0]}:{resolution[1]}", "-c:v", "libx264",
             "-tune", "stillimage", "-c:a", "aac", "-b:a", "192k", "-pix_fmt",
             "yuv420p", "-shortest", output_video
         ]
+        return command, output_video
+
+    def cleanup(self, audio_path: str):
+        """Remove the consumed audio and the image files this generator created"""
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+            print(f"Deleted audio file: {audio_path}")
+        for path in list(self.created):
+            if self._remove(path):
+                print(f"Deleted image file: {path}")
+
+    def _remove(self, path: str) -> bool:
+        self.created.discard(path)
+        if os.path.exists(path):
+            os.remove(path)
+            return True
+        return False
+
+    def generate(self, audio_path: str):
+        """Generate video with the processed image and audio"""
+        prepared = self.build_command(audio_path)
+        if not prepared:
+            return None
+        command, output_video = prepared
 
         try:
             subprocess.run(command, check=True)
@@ -150,9 +193,26 @@ class VideoGenerator:
             print(f"Failed to generate video: {e}")
             return None
         finally:
-            if os.path.exists(audio_path):
-                os.remove(audio_path)
-                print(f"Deleted audio file: {audio_path}")
-            if os.path.exists(self.image_path):
-                os.remove(self.image_path)
-                print(f"Deleted image file: {self.image_path}")
+            self.cleanup(audio_path)
+
+    async def agenerate(self, audio_path: str, run_command):
+        """Generate video through an async command runner instead of blocking"""
+        prepared = self.build_command(audio_path)
+        if not prepared:
+            return None
+        command, output_video = prepared
+
+        consumed = True
+        try:
+            await run_command(command)
+            print(f"Video generated: {output_video}")
+            return output_video
+        except subprocess.CalledProcessError as e:
+            print(f"Failed to generate video: {e}")
+            return None
+        except asyncio.CancelledError:
+            consumed = False  # keep the inputs so a retry can render again
+            raise
+        finally:
+            if consumed:
+                self.cleanup(audio_path)
@@ -0,0 +1,138 @@
+"""
+Tokenizer and stopword data for the summarizer, read from a local cache instead of the network.
+
+    python -m src.core.genai.nltk_resources            # download into the cache, e.g. at image build
+    python -m src.core.genai.nltk_resources --check    # exit non-zero when something is missing
+    python -m src.core.genai.nltk_resources --source /usr/share/nltk_data   # copy, no network
+"""
+import argparse
+import os
+import shutil
+import sys
+import threading
+import zipfile
+from typing import FrozenSet, Optional, Sequence
+
+import nltk
+from nltk.corpus.reader import WordListCorpusReader
+from nltk.data import ZipFilePathPointer
+from nltk.tokenize.punkt import PunktSentenceTokenizer, load_punkt_params
+
+home_dir = os.path.expanduser("~")
+
+
+class NltkResourceConfig:
+    # one directory per nltk release, the pickled/tab formats change between them
+    DATA_DIR = os.getenv("NLTK_RESOURCE_DIR",
+                         os.path.join(home_dir, "ai-agent.nltk", f"nltk-{nltk.__version__}"))
+    LANGUAGE = "english"
+    # package id -> path nltk.data.find resolves inside the data dir; the trailing
+    # slash lets find fall back to the package zip, e.g. corpora/stopwords.zip/stopwords/
+    PACKAGES = {
+        "punkt_tab": "tokenizers/punkt_tab/",  # sent_tokenize reads punkt_tab since nltk 3.8.2
+        "stopwords": "corpora/stopwords/",
+    }
+
+
+class NltkDataMissing(RuntimeError):
+    pass
+
+
+class NltkResources:
+    """Lazily loaded sentence tokenizer and stop words, one copy per process."""
+
+    def __init__(self, data_dir: str = NltkResourceConfig.DATA_DIR,
+                 language: str = NltkResourceConfig.LANGUAGE):
+        self.data_dir = data_dir
+        self.language = language
+        self._lock = threading.Lock()
+        self._tokenizer: Optional[PunktSentenceTokenizer] = None
+        self._stop_words: Optional[FrozenSet[str]] = None
+
+    def missing(self) -> list[str]:
+        """Packages not present in the data dir."""
+        missing = []
+        for package, resource in NltkResourceConfig.PACKAGES.items():
+            try:
+                nltk.data.find(resource, paths=[self.data_dir])
+            except LookupError:
+                missing.append(package)
+        return missing
+
+    def require(self):
+        """Raise NltkDataMissing unless every package is bundled; cheap, loads nothing."""
+        missing = self.missing()
+        if missing:
+            raise NltkDataMissing(
+                f"nltk data {', '.join(missing)} not found in {self.data_dir}. Bundle it with "
+                f"`python -m src.core.genai.nltk_resources` or point NLTK_RESOURCE_DIR at a bundled copy")
+
+    def stop_words(self) -> FrozenSet[str]:
+        if self._stop_words is None:
+            with self._lock:
+                if self._stop_words is None:
+                    root = self._find(NltkResourceConfig.PACKAGES["stopwords"])
+                    reader = WordListCorpusReader(root, [self.language])
+                    self._stop_words = frozenset(reader.words(self.language))
+        return self._stop_words
+
+    def sentence_tokenizer(self) -> PunktSentenceTokenizer:
+        if self._tokenizer is None:
+            with self._lock:
+                if self._tokenizer is None:
+                    lang_dir = self._find(f"{NltkResourceConfig.PACKAGES['punkt_tab']}{self.language}/")
+                    tokenizer = PunktSentenceTokenizer()
+                    tokenizer._params = load_punkt_params(lang_dir)
+                    self._tokenizer = tokenizer
+        return self._tokenizer
+
+    def sent_tokenize(self, text: str) -> list[str]:
+        return self.sentence_tokenizer().tokenize(text)
+
+    def _find(self, resource: str):
+        try:
+            return nltk.data.find(resource, paths=[self.data_dir])
+        except LookupError:
+            self.require()
+            raise
+
+    def bundle(self, packages: Sequence[str] = tuple(NltkResourceConfig.PACKAGES),
+               source: Optional[str] = None):
+        """Fill the data dir, copying from an existing nltk_data dir or downloading."""
+        os.makedirs(self.data_dir, exist_ok=True)
+        for package in packages:
+            resource = NltkResourceConfig.PACKAGES[package].rstrip("/")
+            if source:
+                found = nltk.data.find(f"{resource}/", paths=[source])
+                if isinstance(found, ZipFilePathPointer):
+                    # punkt tables are opened as plain files, so zips are unpacked
+                    with zipfile.ZipFile(found.zipfile.filename) as archive:
+                        archive.extractall(os.path.join(self.data_dir, os.path.dirname(resource)))
+                else:
+                    shutil.copytree(str(found), os.path.join(self.data_dir, resource), dirs_exist_ok=True)
+            elif not nltk.download(package, download_dir=self.data_dir, quiet=True, raise_on_error=True):
+                raise NltkDataMissing(f"downloading nltk package {package} failed")
+            print(f"[nltk] {package} bundled in {self.data_dir}")
+        self.require()
+
+
+NLTK_RESOURCES = NltkResources()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bundle the nltk data the summarizer needs")
+    parser.add_argument("--dir", default=NltkResourceConfig.DATA_DIR, help="cache directory to fill")
+    parser.add_argument("--source", default=None, help="copy from this nltk_data dir instead of downloading")
+    parser.add_argument("--check", action="store_true", help="only verify the cache")
+    args = parser.parse_args()
+
+    resources = NltkResources(args.dir)
+    try:
+        if args.check:
+            resources.require()
+            print(f"[nltk] all packages present in {args.dir}")
+        else:
+            resources.bundle(source=args.source)
+    except (NltkDataMissing, LookupError, ValueError) as e:
+        print(f"[nltk] {e}")
+        sys.exit(1)
@@ -1,17 +1,27 @@
-import nltk
 import re
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
+from concurrent.futures import Executor
+from typing import Callable, Iterable, Optional
 
-# Download required NLTK data (one-time)
-nltk.download('punkt')
-nltk.download('stopwords')
+import numpy as np
+from scipy.sparse import csr_matrix
+from src.core.genai.nltk_resources import NLTK_RESOURCES
+
+_WORD = re.compile(r'[a-z0-9]+')
 
 class Summarizer:
-    def __init__(self, num_sentences=3):
-        """Initialize with desired number of sentences in summary."""
+    def __init__(self, num_sentences=3, max_seconds: Optional[float] = None,
+                 duration: Optional[Callable[[str], float]] = None):
+        """Initialize with desired number of sentences and, optionally, a spoken length budget."""
         self.num_sentences = num_sentences
-        self.stop_words = set(stopwords.words('english'))
+        self.max_seconds = max_seconds
+        self.duration = duration  # text -> seconds spoken, e.g. SpeechRate.seconds
+        if max_seconds is not None and duration is None:
+            raise ValueError("max_seconds needs a duration estimate")
+
+    @property
+    def stop_words(self):
+        # loaded on first use from the local nltk cache, once per process
+        return NLTK_RESOURCES.stop_words()
 
     def clean_text(self, text):
         """Clean the text by removing URLs, emojis, quotes, and other noise."""
@@ -31,24 +41,49 @@ class Summarizer:
         """Generate a summary of the input text."""
         # Clean the text first
         cleaned_text = self.clean_text(text)
+        # identical sentences are one candidate
+        sentences = list(dict.fromkeys(NLTK_RESOURCES.sent_tokenize(cleaned_text)))
+        if not sentences:
+            return ''
+
+        counts = self.term_counts(sentences)
+        # a sentence scores the corpus frequency of every distinct word it contains
+        word_freq = np.asarray(counts.sum(axis=0)).ravel()
+        presence = counts.copy()
+        presence.data[:] = 1
+        scores = presence @ word_freq
+
+        # Select top sentences for summary, ties keep document order
+        ranked = np.argsort(-scores, kind='stable')
+        top, spent = [], 0.0
+        for index in ranked:
+            if scores[index] <= 0 or len(top) == self.num_sentences:
+                break
+            if self.max_seconds is not None:
+                # a sentence too long for what is left gives way to lower scoring shorter ones
+                seconds = self.duration(sentences[index])
+                if spent + seconds > self.max_seconds:
+                    continue
+                spent += seconds
+            top.append(index)
+        return ' '.join(sentences[index] for index in top)
+
+    def term_counts(self, sentences: list[str]) -> csr_matrix:
+        """Sentence by vocabulary matrix of whole-word counts, stop words left out."""
+        vocabulary, rows, columns = {}, [], []
+        stop_words = self.stop_words
+        for row, sentence in enumerate(sentences):
+            for word in _WORD.findall(sentence.lower()):
+                if word not in stop_words:
+                    rows.append(row)
+                    columns.append(vocabulary.setdefault(word, len(vocabulary)))
+        # duplicate (row, column) pairs are summed into counts
+        return csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, columns)),
+                          shape=(len(sentences), len(vocabulary)))
 
-        # Tokenize words and sentences from cleaned text
-        words = word_tokenize(cleaned_text.lower())
-        sentences = sent_tokenize(cleaned_text)
-
-        # Calculate word frequencies
-        word_freq = {}
-        for word in words:
-            if word not in self.stop_words and word.isalnum():
-                word_freq[word] = word_freq.get(word, 0) + 1
-
-        # Score sentences based on word frequencies
-        sentence_scores = {}
-        for sent in sentences:
-            for word, freq in word_freq.items():
-                if word in sent.lower():
-                    sentence_scores[sent] = sentence_scores.get(sent, 0) + freq
-
-        # Select top sentences for summary
-        summary_sentences = sorted(sentence_scores, key=sentence_scores.get, reverse=True)[:self.num_sentences]
-        return ' '.join(summary_sentences)
+    def generate_many(self, texts: Iterable[str], executor: Optional[Executor] = None,
+                      chunksize: int = 8) -> list[str]:
+        """Summaries of texts in order; spread over executor, e.g. a process pool, when given."""
+        if executor is None:
+            return [self.generate(text) for text in texts]
+        return list(executor.map(self.generate, texts, chunksize=chunksize))
@@ -1,26 +1,330 @@
+import argparse
+import asyncio
+import collections
+import contextvars
+import json
+import queue
 import subprocess
+import threading
+import time
 import uuid
 import os
+import re
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from src.core.genai.nltk_resources import NLTK_RESOURCES
+from src.plugins.task_executors import charge_cpu
+
+_SENTENCE_END = re.compile(r'[.!?]+(?:\s|$)')
+
+
+class SpeechRate:
+    """How fast a piper voice speaks, to budget text before it is voiced."""
+
+    def __init__(self, words_per_second: float, sentence_pause: float = 0.2):
+        self.words_per_second = words_per_second
+        self.sentence_pause = sentence_pause  # piper's --sentence_silence default
+
+    def seconds(self, text: str) -> float:
+        """Estimated length of the spoken text; a fragment counts as one sentence."""
+        sentences = max(1, len(_SENTENCE_END.findall(text)))
+        return len(text.split()) / self.words_per_second + sentences * self.sentence_pause
+
+
+# per voice at the default length scale; PiperTextToSpeech.calibrate measures a voice
+# and saves the rate next to its model, which then wins over these
+VOICE_RATES = {
+    "en_US-ryan-high": SpeechRate(2.7),
+    "en_US-lessac-medium": SpeechRate(2.6),
+}
+# unknown voices are assumed slow so their text is never under-budgeted
+DEFAULT_RATE = SpeechRate(2.2)
+
+
+def rate_path(model_path: str) -> str:
+    return f"{model_path}.rate.json"
+
+
+def load_rate(model_path: str) -> Optional[SpeechRate]:
+    """The calibrated rate saved for a model, None when it was never calibrated."""
+    try:
+        with open(rate_path(model_path)) as fp:
+            saved = json.load(fp)
+        return SpeechRate(saved["words_per_second"], saved["sentence_pause"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_rate(model_path: str, rate: SpeechRate):
+    path = rate_path(model_path)
+    staging = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(staging, "w") as fp:
+        json.dump({"words_per_second": rate.words_per_second, "sentence_pause": rate.sentence_pause}, fp)
+    os.replace(staging, path)
+
+
+def wav_seconds(path: str) -> float:
+    with wave.open(path, "rb") as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+def join_wavs(parts: list[str], output_filename: str, silence: float) -> str:
+    """Concatenate wavs of one format in order, with silence seconds between them.
+
+    Trailing digital silence, the pause piper appends to every sentence, is
+    trimmed from each part first so the gaps are exactly silence long.
+    """
+    with wave.open(parts[0], "rb") as first:
+        params = first.getparams()
+    frame_size = params.nchannels * params.sampwidth
+    gap = b"\0" * (int(params.framerate * silence) * frame_size)
+    with wave.open(output_filename, "wb") as out:
+        out.setparams(params)
+        for index, part in enumerate(parts):
+            with wave.open(part, "rb") as wav:
+                if wav.getparams()[:3] != params[:3]:
+                    raise ValueError(f"{part} is {wav.getparams()[:3]}, expected {params[:3]}")
+                frames = wav.readframes(wav.getnframes())
+                if index < len(parts) - 1:
+                    trimmed = len(frames.rstrip(b"\0"))
+                    # round up to whole frames, a stripped low byte of the last sample comes back
+                    frames = frames[:-(-trimmed // frame_size) * frame_size] + gap
+                out.writeframes(frames)
+    return output_filename
+
+
+class PiperWorkerError(RuntimeError):
+    pass
+
+
+class PiperWorker:
+    """One long-lived piper process in --json-input mode; the model is loaded once.
+
+    Each request is a json line {"text", "output_file"} on stdin and piper
+    answers with the path it wrote on stdout. stderr is drained in the
+    background and its tail kept for error messages.
+    """
+
+    def __init__(self, piper_binary_path: str, model_path: str, index: int = 0):
+        self.command = [piper_binary_path, "--model", model_path, "--json-input", "--output_dir", "/tmp"]
+        self.index = index
+        self.process: Optional[subprocess.Popen] = None
+        self.starts = 0
+        self.requests = 0
+        self.last_error: Optional[str] = None
+        self._lines: queue.Queue = queue.Queue()
+        self._stderr = collections.deque(maxlen=20)
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        self.stop()
+        self._lines = queue.Queue()  # never read an answer meant for the previous process
+        try:
+            self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            raise PiperWorkerError(f"cannot start piper worker {self.index}: {e}")
+        self.starts += 1
+        threading.Thread(target=self._pump, args=(self.process.stdout, self._lines.put, True),
+                         name=f"piper-{self.index}-out", daemon=True).start()
+        threading.Thread(target=self._pump, args=(self.process.stderr, self._stderr.append, False),
+                         name=f"piper-{self.index}-err", daemon=True).start()
+
+    def cpu_seconds(self) -> Optional[float]:
+        """User plus system cpu of the running process so far, None where /proc is unavailable."""
+        try:
+            with open(f"/proc/{self.process.pid}/stat") as stat:
+                # fields after the parenthesised command name, utime and stime are 14 and 15
+                fields = stat.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        except (AttributeError, OSError, IndexError, ValueError):
+            return None
+
+    def stop(self):
+        if self.alive():
+            self.process.kill()
+            self.process.wait()
+
+    def synthesize(self, text: str, output_file: str, timeout: float) -> str:
+        """Voice text into output_file; the process is killed when it takes longer than timeout."""
+        request = json.dumps({"text": text, "output_file": output_file}) + "\n"
+        try:
+            self.process.stdin.write(request.encode())
+            self.process.stdin.flush()
+        except OSError as e:
+            raise PiperWorkerError(f"piper worker {self.index} is gone: {e}; {self.stderr_tail()}")
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            self.stop()
+            raise TimeoutError(f"piper worker {self.index} took over {timeout}s")
+        if line is None:
+            raise PiperWorkerError(f"piper worker {self.index} exited with {self.process.wait()}; "
+                                   f"{self.stderr_tail()}")
+        self.requests += 1
+        return line.decode().strip()
+
+    def stderr_tail(self) -> str:
+        return b" | ".join(self._stderr).decode(errors="replace")[-500:]
+
+    @staticmethod
+    def _pump(stream, sink, mark_end: bool):
+        for line in iter(stream.readline, b""):
+            sink(line.rstrip(b"\n"))
+        if mark_end:
+            sink(None)  # the process exited, wakes a waiting request
+
+
+class PiperPool:
+    """Long-lived piper workers shared by every synthesis in the process.
+
+    A request takes an idle worker, restarting it first when it died. A worker
+    that crashes mid request is restarted and the request tried once more; one
+    that times out is killed and restarted on its next use.
+    """
+
+    def __init__(self, piper_binary_path: str, model_path: str, size: int = 2, timeout: float = 120.0):
+        self.timeout = timeout  # per request; the first one after a start also covers model load
+        self.workers = [PiperWorker(piper_binary_path, model_path, index) for index in range(size)]
+        self._idle: queue.Queue = queue.Queue()
+        for worker in self.workers:
+            self._idle.put(worker)
+
+    def generate(self, text: str, output_file: Optional[str] = None,
+                 abort: Optional[threading.Event] = None) -> str:
+        """Voice text on an idle worker; once abort is set a request still waiting for one gives up."""
+        output_file = output_file or f"/tmp/{uuid.uuid4()}.wav"
+        worker = self._idle.get()
+        try:
+            if abort is not None and abort.is_set():
+                raise PiperWorkerError("request abandoned before a worker took it")
+            for attempt in (1, 2):
+                if not worker.alive():
+                    worker.start()
+                # the worker is never reaped between requests, so rusage of children misses it
+                cpu = worker.cpu_seconds()
+                try:
+                    worker.synthesize(text, output_file, self.timeout)
+                    used = worker.cpu_seconds()
+                    charge_cpu(None if cpu is None or used is None else used - cpu)
+                    return output_file
+                except (PiperWorkerError, TimeoutError) as e:
+                    worker.last_error = str(e)
+                    if attempt == 2 or isinstance(e, TimeoutError):
+                        raise
+                    print(f"[piper] {e}, restarting")
+        finally:
+            self._idle.put(worker)
+
+    def health_check(self, probe: str = "Ready.") -> list[dict]:
+        """Restart dead idle workers and voice a short probe on each; busy ones are reported as is."""
+        report = []
+        for _ in range(len(self.workers)):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            output_file = f"/tmp/{uuid.uuid4()}.wav"
+            started = time.perf_counter()
+            try:
+                if not worker.alive():
+                    worker.start()
+                worker.synthesize(probe, output_file, self.timeout)
+                healthy = os.path.exists(output_file)
+            except (PiperWorkerError, TimeoutError) as e:
+                worker.last_error, healthy = str(e), False
+            finally:
+                if os.path.exists(output_file):
+                    os.remove(output_file)
+                self._idle.put(worker)
+            report.append({"worker": worker.index, "healthy": healthy,
+                           "probe_ms": round((time.perf_counter() - started) * 1000, 1)})
+        checked = {entry["worker"] for entry in report}
+        for worker in self.workers:
+            if worker.index not in checked:
+                report.append({"worker": worker.index, "healthy": worker.alive(), "busy": True})
+        return sorted(report, key=lambda entry: entry["worker"])
+
+    def stats(self) -> list[dict]:
+        return [{"worker": worker.index, "alive": worker.alive(), "starts": worker.starts,
+                 "requests": worker.requests, "last_error": worker.last_error} for worker in self.workers]
+
+    def close(self):
+        for worker in self.workers:
+            worker.stop()
+
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def piper_pool(piper_binary_path: str, model_path: str, size: int = 2, timeout: float = 120.0) -> PiperPool:
+    """Process-wide pool for a binary and model, created on first use; later calls get it whatever size they ask."""
+    with _pools_lock:
+        key = (piper_binary_path, model_path)
+        if key not in _pools:
+            _pools[key] = PiperPool(piper_binary_path, model_path, size, timeout)
+        return _pools[key]
+
 
 class PiperTextToSpeech:
-    def __init__(self, piper_binary_path: str = os.path.expanduser("~/.piper/piper/piper"), model: str = "en_US-ryan-high.onnx"):
+    def __init__(self, piper_binary_path: str = os.path.expanduser("~/.piper/piper/piper"), model: str = "en_US-ryan-high.onnx",
+                 pool: Optional[PiperPool] = None):
         self.piper_binary_path = piper_binary_path
         # Assume model is in the same directory as piper unless a full path is provided
         self.model_path = model if os.path.isabs(model) else os.path.join(os.path.dirname(piper_binary_path), model)
+        self.pool = pool  # long-lived workers, see piper_pool; without one every call spawns piper
+        self.voice = os.path.basename(self.model_path).removesuffix(".onnx")
+        self.rate = load_rate(self.model_path) or VOICE_RATES.get(self.voice, DEFAULT_RATE)
 
-    def generate(self, text: str) -> str:
-        """
-        Generate an audio file from the given text using the Piper binary.
-        """
-        output_filename = f"/tmp/{uuid.uuid4()}.wav"
+    def pooled(self, size: int = 2, timeout: float = 120.0) -> "PiperTextToSpeech":
+        """Use the shared worker pool of this binary and model."""
+        self.pool = piper_pool(self.piper_binary_path, self.model_path, size, timeout)
+        return self
 
-        command = [
+    def calibrate(self, samples: list[str]) -> SpeechRate:
+        """Voice the samples, fit words per second to the produced audio and save
+        the rate next to the model so every later instance of the voice uses it."""
+        words = sentences = seconds = 0.0
+        for text in samples:
+            audio = self.generate(text)
+            try:
+                seconds += wav_seconds(audio)
+            finally:
+                os.remove(audio)
+            words += len(text.split())
+            sentences += max(1, len(_SENTENCE_END.findall(text)))
+        pause = self.rate.sentence_pause
+        self.rate = SpeechRate(words / max(seconds - sentences * pause, 1e-6), pause)
+        save_rate(self.model_path, self.rate)
+        return self.rate
+
+    def build_command(self, output_filename: str) -> list[str]:
+        """Command line that reads text on stdin and writes a wav to output_filename."""
+        return [
             self.piper_binary_path,
             "--model",
             self.model_path,
             "--output_file",
             output_filename,
         ]
+
+    def generate(self, text: str, output_filename: Optional[str] = None,
+                 abort: Optional[threading.Event] = None) -> str:
+        """
+        Generate an audio file from the given text using the Piper binary.
+        """
+        output_filename = output_filename or f"/tmp/{uuid.uuid4()}.wav"
+        if self.pool:
+            self.pool.generate(text, output_filename, abort)
+            print(f"Audio generated: {output_filename}")
+            return output_filename
+
+        command = self.build_command(output_filename)
         try:
             # Pipe the text into the subprocess
             subprocess.run(command, input=text.encode(), check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -29,3 +333,97 @@ class PiperTextToSpeech:
         except subprocess.CalledProcessError as e:
             print(f"Error: {e.stderr.decode('utf-8')}")
             raise
+
+    def generate_chunked(self, text: str, sentence_silence: Optional[float] = None) -> str:
+        """
+        Voice every sentence on its own, in parallel across the pool workers (or
+        one piper per core without a pool), and join them in order into one wav.
+        """
+        sentences = NLTK_RESOURCES.sent_tokenize(text)
+        if len(sentences) < 2:
+            return self.generate(text)
+        workers = len(self.pool.workers) if self.pool else os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=min(workers, len(sentences)), thread_name_prefix="piper-chunk") as executor:
+            # each chunk runs in the caller's context so pooled cpu reaches its meter
+            futures = [executor.submit(contextvars.copy_context().run, self.generate, sentence)
+                       for sentence in sentences]
+        return self._join_chunks([future.exception() or future.result() for future in futures], sentence_silence)
+
+    async def agenerate_chunked(self, text: str, run_command, sentence_silence: Optional[float] = None) -> str:
+        """generate_chunked for the event loop; without a pool the chunks go through run_command."""
+        sentences = NLTK_RESOURCES.sent_tokenize(text)
+        if len(sentences) < 2:
+            return await self.agenerate(text, run_command)
+        # named up front so a cancelled run can still find and remove every chunk
+        paths = [f"/tmp/{uuid.uuid4()}.wav" for _ in sentences]
+        abort = threading.Event()
+        chunks = asyncio.gather(*(self.agenerate(sentence, run_command, path, abort)
+                                  for sentence, path in zip(sentences, paths)), return_exceptions=True)
+        try:
+            parts = await asyncio.shield(chunks)
+            return await asyncio.to_thread(self._join_chunks, parts, sentence_silence)
+        except asyncio.CancelledError:
+            # pooled chunks run on threads that cannot be cancelled: the ones still waiting
+            # for a worker give up, the rest finish before their wavs are removed
+            abort.set()
+            if not self.pool:
+                chunks.cancel()  # run_command kills the binaries
+            await asyncio.gather(chunks, return_exceptions=True)
+            raise
+        finally:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _join_chunks(self, parts: list, sentence_silence: Optional[float]) -> str:
+        # parts are wav paths or the exception of the chunk that failed
+        try:
+            failed = next((part for part in parts if isinstance(part, BaseException)), None)
+            if failed is not None:
+                raise failed
+            # the gap piper leaves between sentences itself, which the speech rate assumes
+            silence = self.rate.sentence_pause if sentence_silence is None else sentence_silence
+            output_filename = join_wavs(parts, f"/tmp/{uuid.uuid4()}.wav", silence)
+            print(f"Audio generated: {output_filename} from {len(parts)} chunks")
+            return output_filename
+        finally:
+            for part in parts:
+                if isinstance(part, str) and os.path.exists(part):
+                    os.remove(part)
+
+    async def agenerate(self, text: str, run_command, output_filename: Optional[str] = None,
+                        abort: Optional[threading.Event] = None) -> str:
+        """
+        Same as generate, but the binary is started through an async runner
+        such as BaseTask.run_subprocess so the event loop is never blocked.
+        With a pool the request goes to a worker from a thread instead.
+        """
+        if self.pool:
+            return await asyncio.to_thread(self.generate, text, output_filename, abort)
+        output_filename = output_filename or f"/tmp/{uuid.uuid4()}.wav"
+
+        try:
+            await run_command(self.build_command(output_filename), input=text.encode())
+            print(f"Audio generated: {output_filename}")
+            return output_filename
+        except subprocess.CalledProcessError as e:
+            print(f"Error: {e.stderr.decode('utf-8')}")
+            raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the speech rate of a piper voice")
+    parser.add_argument("--binary", default=os.path.expanduser("~/.piper/piper/piper"))
+    parser.add_argument("--model", default="en_US-ryan-high.onnx")
+    parser.add_argument("samples", nargs="*", default=[
+        "The city council approved the new budget after a long debate on Tuesday evening.",
+        "Heavy rain is expected across the region this weekend. Officials have asked residents to stay alert.",
+        "The team won the final by two goals, ending a ten year wait for the trophy.",
+    ])
+    args = parser.parse_args()
+
+    tts = PiperTextToSpeech(args.binary, args.model)
+    rate = tts.calibrate(args.samples)
+    print(f"[piper] {tts.voice}: {rate.words_per_second:.2f} words/s, saved to {rate_path(tts.model_path)}")
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, String, JSON, UniqueConstraint, Integer, Float, DateTime, event
+from src.datasource.sqlalchemy.model_base import BaseModel
+
+
+class PipelineCheckpoints(BaseModel):
+    __tablename__ = "pipeline_checkpoints"
+
+    pipeline_id = Column(String, nullable=False, index=True)
+    task_key = Column(String, nullable=False)
+    outputs = Column(JSON, nullable=True)  # xcom keys written by the task plus its result
+
+    __table_args__ = (UniqueConstraint('pipeline_id',
+                                       'task_key',
+                                       name='pipeline_task_uc'), )
+
+
+class PipelineTaskRuns(BaseModel):
+    """One row per task execution, kept for stage latency and capacity reports."""
+    __tablename__ = "pipeline_task_runs"
+
+    pipeline_id = Column(String, nullable=True, index=True)
+    task_key = Column(String, nullable=False)
+    task_name = Column(String, nullable=True)
+    stage = Column(String, nullable=False, index=True)
+    status = Column(String, nullable=False)  # completed, failed, cached
+    started_at = Column(DateTime, nullable=False, index=True)
+    ended_at = Column(DateTime, nullable=False)
+    wall_ms = Column(Float, nullable=False)
+    cpu_ms = Column(Float, nullable=True)  # cpu of offloaded work and child processes
+    attempts = Column(Integer, nullable=False, default=1)
+    wait_ms = Column(Float, nullable=True)  # time queued for a resource pool slot
+    input_bytes = Column(Integer, nullable=True)
+    output_bytes = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+
+
+@event.listens_for(PipelineCheckpoints, 'after_insert')
+def log_checkpoint(mapper, connection, target):
+    print(f"Checkpointed {target.pipeline_id} / {target.task_key}")
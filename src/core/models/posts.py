@@ -33,9 +33,19 @@ class PostQueue(BaseModel):
     __tablename__ = "post_queue"
 
     tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
-    status = Column(String, nullable=False, default=PostQueueStages.processing)
+    status = Column(String, nullable=False, default=PostQueueStages.processing, index=True)
     post_data = Column(JSON, nullable=True)
 
+    # lease held by the worker currently handling the row; an expired lease
+    # makes the row claimable again
+    lease_owner = Column(String, nullable=True, index=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=True)  # retry backoff
+    # caller supplied key so a retried request does not queue the same post twice
+    dedupe_key = Column(String, nullable=True, index=True)
+
     __table_args__ = (UniqueConstraint('tenant_id',
                                        'id',
                                        name='tenant_postqueue_uc'), )
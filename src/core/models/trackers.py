@@ -13,6 +13,15 @@ class Trackers(BaseModel):
                                        'url',
                                        name='tenant_url_uc'), )
 
+class CrawlCursors(BaseModel):
+    """High-water mark of an incremental crawl: the newest urls seen per source."""
+    __tablename__ = "crawl_cursors"
+
+    source = Column(String, nullable=False, unique=True)
+    high_water_url = Column(String, nullable=True)
+    seen_urls = Column(JSON, nullable=False, default=list)  # newest first, bounded
+
+
 @event.listens_for(Trackers, 'after_insert')
 def log_insert(mapper, connection, target):
     print(f"Inserted in trackers {target.id}: ", target)
@@ -0,0 +1,176 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from uuid import UUID
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from src.core.models.posts import PostQueue, PostQueueStages, PostProcessingLogs, PostProcessingStatusStages
+from src.datasource.sqlalchemy.repo import BaseRepository
+from src.datasource.sqlite import SessionLocal
+
+
+class PostQueueEngine:
+    """Work queue on top of the post_queue table.
+
+    Rows with status processing are pending work. A worker claims one by
+    writing a unique lease token and expiry in a single UPDATE, which SQLite
+    serializes across processes, so a row is never handed out twice while
+    its lease is alive. Workers heartbeat to extend the lease; a crashed
+    worker's lease expires and the row becomes claimable again.
+    """
+
+    def __init__(self,
+                 session_factory: Callable[[], Session] = SessionLocal,
+                 lease_seconds: int = 300,
+                 max_attempts: int = 3,
+                 retry_backoff: int = 60):
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    def enqueue(self, tenant_id: str, post_data: dict, dedupe_key: Optional[str] = None) -> PostQueue:
+        """Queue a post; with a dedupe_key, a pending or completed row for the same
+        key is returned instead of queueing a second one."""
+        with self.session_factory() as db:
+            record = None
+            if dedupe_key:
+                record = db.query(PostQueue).filter(
+                    PostQueue.tenant_id == UUID(tenant_id),
+                    PostQueue.dedupe_key == dedupe_key,
+                    PostQueue.status != PostQueueStages.failed).first()
+            if record is None:
+                record = BaseRepository(PostQueue, db).create(
+                    PostQueue(tenant_id=UUID(tenant_id),
+                              status=PostQueueStages.processing,
+                              post_data=post_data,
+                              dedupe_key=dedupe_key))
+            db.expunge(record)
+            return record
+
+    def get(self, queue_id: str, tenant_id: Optional[str] = None) -> Optional[PostQueue]:
+        """The queue row, or None; with a tenant_id, only when it belongs to that tenant."""
+        with self.session_factory() as db:
+            record = BaseRepository(PostQueue, db).get_by_id(UUID(queue_id))
+            if record is None or (tenant_id is not None and record.tenant_id != UUID(tenant_id)):
+                return None
+            db.expunge(record)
+            return record
+
+    def logs(self, queue_id: str) -> List[PostProcessingLogs]:
+        with self.session_factory() as db:
+            records = db.query(PostProcessingLogs).filter(
+                PostProcessingLogs.post_queue_id == UUID(queue_id)).order_by(
+                    PostProcessingLogs.id).all()
+            db.expunge_all()
+            return records
+
+    def _claimable(self, now: datetime):
+        return and_(
+            PostQueue.status == PostQueueStages.processing,
+            or_(PostQueue.lease_owner.is_(None), PostQueue.lease_expires_at < now),
+            or_(PostQueue.available_at.is_(None), PostQueue.available_at <= now))
+
+    def claim(self, worker_id: str, queue_id: Optional[UUID] = None) -> Optional[PostQueue]:
+        """Lease the oldest claimable row, or only queue_id when given, to this worker; None if there is none."""
+        token = f"{worker_id}:{uuid.uuid4().hex}"
+        now = datetime.utcnow()
+        candidate = queue_id
+        if candidate is None:
+            candidate = select(PostQueue.id).where(self._claimable(now)).order_by(
+                PostQueue.created_at).limit(1).scalar_subquery()
+        statement = update(PostQueue).where(
+            PostQueue.id == candidate, self._claimable(now)).values(
+                lease_owner=token,
+                lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                heartbeat_at=now,
+                attempts=PostQueue.attempts + 1).execution_options(
+                    synchronize_session=False)
+
+        with self.session_factory() as db:
+            try:
+                claimed = db.execute(statement).rowcount
+                db.commit()
+            except OperationalError as e:
+                db.rollback()
+                if "database is locked" not in str(e.orig):
+                    raise  # e.g. a missing column, never a reason to wait for the next poll
+                print("[queue] claim skipped, database locked by another writer")
+                return None
+            if not claimed:
+                return None
+            record = db.query(PostQueue).filter(PostQueue.lease_owner == token).first()
+            db.expunge(record)
+            return record
+
+    def heartbeat(self, queue_id: UUID, token: str) -> bool:
+        """Extend the lease; False means it expired and another worker may own the row."""
+        now = datetime.utcnow()
+        return self._update_leased(queue_id, token, {
+            "heartbeat_at": now,
+            "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+        })
+
+    def complete(self, queue_id: UUID, token: str, message: str = "Post processed successfully.") -> bool:
+        """Mark the row done; False when the lease was lost and another worker may post it again."""
+        done = self._update_leased(queue_id, token, {
+            "status": PostQueueStages.completed,
+            "lease_owner": None,
+            "lease_expires_at": None,
+        })
+        if done:
+            self._log(queue_id, PostProcessingStatusStages.success, message)
+        else:
+            self._log(queue_id, PostProcessingStatusStages.error, f"lease lost before completing: {message}")
+        return done
+
+    def fail(self, queue_id: UUID, token: str, error: str, attempts: int) -> bool:
+        """Give the row back for a later retry, or fail it once attempts run out;
+        False when the lease was lost and the row is no longer this worker's."""
+        values = {"lease_owner": None, "lease_expires_at": None}
+        status = PostProcessingStatusStages.error
+        if attempts >= self.max_attempts:
+            values["status"] = PostQueueStages.failed
+            status = PostProcessingStatusStages.failed
+        else:
+            values["available_at"] = datetime.utcnow() + timedelta(seconds=self.retry_backoff * attempts)
+        if not self._update_leased(queue_id, token, values):
+            self._log(queue_id, PostProcessingStatusStages.error, f"lease lost before failing: {error}")
+            return False
+        self._log(queue_id, status, error)
+        return True
+
+    def reclaim_expired(self) -> int:
+        """Release rows whose worker stopped heartbeating; fail those out of attempts."""
+        now = datetime.utcnow()
+        expired = and_(PostQueue.status == PostQueueStages.processing,
+                       PostQueue.lease_owner.is_not(None),
+                       PostQueue.lease_expires_at < now)
+        with self.session_factory() as db:
+            rows = db.query(PostQueue.id, PostQueue.attempts).filter(expired).all()
+            for queue_id, attempts in rows:
+                values = {"lease_owner": None, "lease_expires_at": None}
+                if attempts >= self.max_attempts:
+                    values["status"] = PostQueueStages.failed
+                db.execute(update(PostQueue).where(PostQueue.id == queue_id, expired).values(**values))
+                db.add(PostProcessingLogs(
+                    post_queue_id=queue_id,
+                    status=PostProcessingStatusStages.failed if attempts >= self.max_attempts
+                    else PostProcessingStatusStages.error,
+                    message="lease expired, worker stopped heartbeating"))
+            db.commit()
+            return len(rows)
+
+    def _update_leased(self, queue_id: UUID, token: str, values: dict) -> bool:
+        with self.session_factory() as db:
+            updated = db.execute(
+                update(PostQueue).where(PostQueue.id == queue_id,
+                                        PostQueue.lease_owner == token).values(**values)).rowcount
+            db.commit()
+            return bool(updated)
+
+    def _log(self, queue_id: UUID, status: str, message: str):
+        with self.session_factory() as db:
+            db.add(PostProcessingLogs(post_queue_id=queue_id, status=status, message=message))
+            db.commit()
@@ -0,0 +1,109 @@
+import os
+import socket
+import threading
+import time
+from typing import Callable, List, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+from src.core.models.posts import PostQueue, Posts
+from src.core.queue.post_queue import PostQueueEngine
+from src.core.socials.base import PlatformResponse
+from src.datasource.sqlite import db_session
+
+
+def publish(db: Session, tenant_id: str, post_data: dict, extras: Optional[dict] = None) -> PlatformResponse:
+    """Post a payload ({post_body, medias, platform}) straight to the platform and store it in posts."""
+    # imported here so the queue engine does not pull in every platform sdk
+    from src.resources.socials.service import SocialsService
+
+    platform = SocialsService(db).get_platform(post_data.get("platform"), str(tenant_id))
+    response = platform.post(post_data.get("post_body"), media_urls=post_data.get("medias"))
+    if not isinstance(response, PlatformResponse):
+        raise RuntimeError(f"platform rejected the post: {response}")
+    db.add(Posts(tenant_id=UUID(str(tenant_id)),
+                 platform=response.platform,
+                 post_id=str(response.post_id),
+                 extras={"post_body": post_data.get("post_body"), **(extras or {})}))
+    db.commit()
+    return response
+
+
+def publish_post(db: Session, job: PostQueue) -> PlatformResponse:
+    """Publish a claimed queue row."""
+    return publish(db, job.tenant_id, job.post_data or {}, extras={"queue_id": str(job.id)})
+
+
+class PostWorker:
+    """Claims post_queue rows one at a time and publishes them, heartbeating the
+    lease while the upload runs."""
+
+    def __init__(self,
+                 engine: Optional[PostQueueEngine] = None,
+                 worker_id: Optional[str] = None,
+                 handler: Callable[[Session, PostQueue], PlatformResponse] = publish_post,
+                 poll_interval: float = 2.0):
+        self.engine = engine or PostQueueEngine()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self.running = True
+
+    def run_once(self, queue_id: Optional[UUID] = None) -> bool:
+        """Handle at most one job, only queue_id when given; returns False when nothing was claimable."""
+        job = self.engine.claim(self.worker_id, queue_id)
+        if job is None:
+            return False
+
+        token = job.lease_owner
+        print(f"[worker {self.worker_id}] claimed {job.id} (attempt {job.attempts})")
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job.id, token, stop), daemon=True)
+        beat.start()
+        try:
+            with db_session() as db:
+                response = self.handler(db, job)
+            if not self.engine.complete(job.id, token, f"posted {response.platform}:{response.post_id}"):
+                # the row was reclaimed while we posted; it may be posted a second time
+                print(f"[worker {self.worker_id}] lost {job.id}: posted "
+                      f"{response.platform}:{response.post_id} after the lease expired")
+        except Exception as e:
+            print(f"[worker {self.worker_id}] {job.id} failed: {e}")
+            if not self.engine.fail(job.id, token, str(e), job.attempts):
+                print(f"[worker {self.worker_id}] lost {job.id}: the lease expired before the failure was recorded")
+        finally:
+            stop.set()
+            beat.join()
+        return True
+
+    def run_forever(self):
+        last_reclaim = 0.0
+        while self.running:
+            try:
+                if time.monotonic() - last_reclaim > self.engine.lease_seconds / 2:
+                    self.engine.reclaim_expired()
+                    last_reclaim = time.monotonic()
+                if self.run_once():
+                    continue
+            except Exception as e:  # keep the worker alive through database hiccups
+                print(f"[worker {self.worker_id}] e: {e}")
+            time.sleep(self.poll_interval)
+
+    def stop(self):
+        self.running = False
+
+    def _heartbeat(self, queue_id, token: str, stop: threading.Event):
+        while not stop.wait(self.engine.lease_seconds / 3):
+            if not self.engine.heartbeat(queue_id, token):
+                print(f"[worker {self.worker_id}] lost lease on {queue_id}")
+                return
+
+
+def start_post_workers(count: int, engine: Optional[PostQueueEngine] = None) -> List[PostWorker]:
+    """Run post workers on daemon threads inside the current process (the api server)."""
+    engine = engine or PostQueueEngine()
+    workers = []
+    for index in range(count):
+        worker = PostWorker(engine=engine, worker_id=f"{socket.gethostname()}:{os.getpid()}:{index}")
+        threading.Thread(target=worker.run_forever, name=f"post-worker-{index}", daemon=True).start()
+        workers.append(worker)
+    return workers
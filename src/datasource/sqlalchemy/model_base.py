@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Column, DateTime, String, inspect, literal, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 from sqlalchemy.orm import declarative_mixin
@@ -33,3 +33,31 @@ class BaseModel(Base, TimestampMixin, UserAuditMixin):
 
 def create_tables():
     BaseModel.metadata.create_all(bind=engine)
+    add_missing_columns()
+
+
+def add_missing_columns():
+    """ALTER existing tables to add columns models gained later; create_all only creates whole tables."""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in BaseModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            added = set()
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                default = column.default.arg if column.default is not None and column.default.is_scalar else None
+                if default is not None:
+                    value = literal(default).compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+                    # sqlite only accepts NOT NULL on an added column with a default
+                    ddl += f" DEFAULT {value}" + ("" if column.nullable else " NOT NULL")
+                connection.execute(text(ddl))
+                added.add(column.name)
+            for index in table.indexes:
+                if added & {column.name for column in index.columns}:
+                    index.create(connection, checkfirst=True)
+            if added:
+                print(f"[migrate] {table.name}: added {', '.join(sorted(added))}")
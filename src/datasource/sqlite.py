@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
@@ -21,13 +22,14 @@ def get_db():
     finally:
         db.close()
 
-def get_db_v2():
-    while True:
-        db = SessionLocal()
-        try:
-            yield db
-        finally:
-            db.close()
+# Session for code running outside a request (agents, workers)
+@contextmanager
+def db_session():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
 def bind_service(Service: any):
     def get_service(db: Session = Depends(get_db)):
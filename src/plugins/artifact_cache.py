@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional
+
+home_dir = os.path.expanduser("~")
+
+
+class ArtifactCacheConfig:
+    CACHE_DIR = os.getenv("ARTIFACT_CACHE_DIR", os.path.join(home_dir, "ai-agent.artifacts"))
+    MAX_BYTES = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+
+class ArtifactCache:
+    """Content addressed store for task outputs.
+
+    Keys are a hash of the task identity, its engine version and its declared
+    inputs (files are hashed by content, not path). Entries are directories
+    holding a meta.json plus copies of any artifact files; the least recently
+    used ones are evicted once the cache grows past max_bytes.
+    """
+
+    META = "meta.json"
+
+    def __init__(self, root: str = ArtifactCacheConfig.CACHE_DIR, max_bytes: int = ArtifactCacheConfig.MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self._index = self._scan()  # key -> (size in bytes, last used)
+
+    def key(self, namespace: str, version: str, inputs: Dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{namespace}\0{version}\0".encode())
+        digest.update(json.dumps(self._fingerprint(inputs), sort_keys=True, default=str).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str, tmp_dir: str = "/tmp") -> Optional[Dict[str, Any]]:
+        """Return the stored outputs, with artifact paths pointing at fresh copies."""
+        entry = self._entry_dir(key)
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            with open(os.path.join(entry, self.META)) as fp:
+                meta = json.load(fp)
+            # consumers delete their inputs, so never hand out the cached file itself
+            outputs = meta["outputs"]
+            for xcom_key, filename in meta["artifacts"].items():
+                restored = os.path.join(tmp_dir, f"{uuid.uuid4()}_{filename}")
+                shutil.copyfile(os.path.join(entry, filename), restored)
+                outputs["xcom"][xcom_key] = restored
+            self._index[key] = (self._index[key][0], time.time())
+            os.utime(os.path.join(entry, self.META))
+            self.hits += 1
+            return outputs
+
+    def put(self, key: str, outputs: Dict[str, Any], artifact_keys: Iterable[str] = ()) -> bool:
+        """Store task outputs; returns False when a declared artifact file is missing."""
+        artifacts = {}
+        for xcom_key in artifact_keys:
+            path = outputs.get("xcom", {}).get(xcom_key)
+            if not isinstance(path, str) or not os.path.isfile(path):
+                return False
+            artifacts[xcom_key] = path
+
+        entry = self._entry_dir(key)
+        staging = f"{entry}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(staging)
+        try:
+            names = {}
+            for xcom_key, path in artifacts.items():
+                names[xcom_key] = f"{xcom_key}{os.path.splitext(path)[1]}"
+                shutil.copyfile(path, os.path.join(staging, names[xcom_key]))
+            with open(os.path.join(staging, self.META), "w") as fp:
+                json.dump({"outputs": outputs, "artifacts": names, "stored_at": time.time()}, fp)
+            with self._lock:
+                if os.path.exists(entry):
+                    shutil.rmtree(entry)
+                os.replace(staging, entry)
+                self._index[key] = (self._dir_size(entry), time.time())
+                self._evict()
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": sum(size for size, _ in self._index.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _evict(self):
+        total = sum(size for size, _ in self._index.values())
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            del self._index[key]
+            total -= size
+            self.evictions += 1
+
+    def _scan(self) -> Dict[str, tuple]:
+        index = {}
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for key in os.listdir(shard_dir):
+                meta = os.path.join(shard_dir, key, self.META)
+                if os.path.exists(meta):
+                    index[key] = (self._dir_size(os.path.join(shard_dir, key)), os.path.getmtime(meta))
+        return index
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+    @classmethod
+    def _fingerprint(cls, value: Any) -> Any:
+        """Replace local file paths by a digest of their content."""
+        if isinstance(value, dict):
+            return {str(k): cls._fingerprint(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls._fingerprint(v) for v in value]
+        if isinstance(value, str) and value.startswith("/") and os.path.isfile(value):
+            digest = hashlib.sha256()
+            with open(value, "rb") as fp:
+                for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            return f"file:{digest.hexdigest()}"
+        return value
@@ -0,0 +1,168 @@
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.datasource.sqlite import engine
+
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class NearDuplicateConfig:
+    # next to the sqlite database, e.g. ~/ai-agent.minhash.npz
+    INDEX_PATH = os.getenv("NEAR_DUPLICATE_INDEX",
+                           os.path.splitext(engine.url.database)[0] + ".minhash.npz")
+    NUM_PERM = 128
+    BANDS = 32  # 32 bands of 4 rows: pairs above ~0.45 jaccard become candidates
+    THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.6"))
+    SHINGLE = 3  # words per shingle
+    MAX_DOCS = 5000  # oldest stories are forgotten past this
+
+
+def shingles(text: str, size: int = NearDuplicateConfig.SHINGLE) -> set:
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHashIndex:
+    """Near-duplicate lookup over story text with MinHash signatures and LSH banding.
+
+    Every document is reduced to NUM_PERM minimum hashes of its word shingles.
+    Signatures are split into bands; documents sharing any band are candidates
+    and a candidate whose estimated jaccard similarity reaches the threshold
+    is a duplicate. The index is saved to one npz file after every change.
+    """
+
+    def __init__(self, path: Optional[str] = NearDuplicateConfig.INDEX_PATH,
+                 num_perm: int = NearDuplicateConfig.NUM_PERM,
+                 bands: int = NearDuplicateConfig.BANDS,
+                 threshold: float = NearDuplicateConfig.THRESHOLD,
+                 max_docs: int = NearDuplicateConfig.MAX_DOCS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_docs = max_docs
+        # fixed seed: signatures stay comparable across restarts
+        generator = np.random.default_rng(1)
+        self._a = generator.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.meta: Dict[str, Dict[str, Any]] = {}
+        self.buckets: Dict[Tuple[int, bytes], set] = {}
+        self.load()
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the text, None when it has no words."""
+        tokens = shingles(text)
+        if not tokens:
+            return None
+        # 32 bit hashes and a < 2**31 keep a * x + b below 2**64 before the modulo
+        hashes = np.fromiter((zlib.crc32(token.encode()) for token in tokens),
+                             dtype=np.uint64, count=len(tokens))
+        permuted = (hashes[:, None] * self._a + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def similarity(self, left: np.ndarray, right: np.ndarray) -> float:
+        return float(np.count_nonzero(left == right)) / self.num_perm
+
+    def query(self, text: str, exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Most similar stored document at or above the threshold, as (doc id, similarity)."""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        with self._lock:
+            return self._best_match(signature, exclude)
+
+    def add(self, doc_id: str, text: str, **meta) -> Optional[Tuple[str, float]]:
+        """Store a document unless a near duplicate is already indexed; returns that duplicate."""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        with self._lock:
+            match = self._best_match(signature, exclude=doc_id)
+            if match is not None:
+                return match
+            self._insert(doc_id, signature, {"added_at": time.time(), **meta})
+            while len(self.signatures) > self.max_docs:
+                oldest = min(self.meta, key=lambda key: self.meta[key]["added_at"])
+                self._remove(oldest)
+            self._save()
+        return None
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            if doc_id in self.signatures:
+                self._remove(doc_id)
+                self._save()
+
+    def _best_match(self, signature: np.ndarray, exclude: Optional[str]) -> Optional[Tuple[str, float]]:
+        candidates = set()
+        for band, key in self._band_keys(signature):
+            candidates |= self.buckets.get((band, key), set())
+        candidates.discard(exclude)
+        best = None
+        for doc_id in candidates:
+            score = self.similarity(signature, self.signatures[doc_id])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (doc_id, score)
+        return best
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _insert(self, doc_id: str, signature: np.ndarray, meta: Dict[str, Any]):
+        if doc_id in self.signatures:
+            self._remove(doc_id)
+        self.signatures[doc_id] = signature
+        self.meta[doc_id] = meta
+        for band_key in self._band_keys(signature):
+            self.buckets.setdefault(band_key, set()).add(doc_id)
+
+    def _remove(self, doc_id: str):
+        signature = self.signatures.pop(doc_id)
+        self.meta.pop(doc_id, None)
+        for band_key in self._band_keys(signature):
+            bucket = self.buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self.buckets[band_key]
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as stored:
+                if stored["signatures"].shape[1:] != (self.num_perm,):
+                    print(f"[near-duplicates] {self.path} was built with other settings, starting empty")
+                    return
+                ids = json.loads(str(stored["ids"]))
+                meta = json.loads(str(stored["meta"]))
+                for doc_id, signature in zip(ids, stored["signatures"]):
+                    self._insert(doc_id, signature.astype(np.uint64), meta.get(doc_id, {"added_at": 0}))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[near-duplicates] could not load {self.path}: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        ids = list(self.signatures)
+        matrix = np.stack([self.signatures[doc_id] for doc_id in ids]) if ids else \
+            np.zeros((0, self.num_perm), dtype=np.uint64)
+        staging = f"{self.path}.tmp.npz"
+        np.savez(staging, signatures=matrix, ids=json.dumps(ids), meta=json.dumps(self.meta))
+        os.replace(staging, self.path)
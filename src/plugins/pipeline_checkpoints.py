@@ -0,0 +1,48 @@
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from src.core.models.pipelines import PipelineCheckpoints
+from src.datasource.sqlalchemy.repo import BaseRepository
+from src.datasource.sqlite import SessionLocal
+
+
+class CheckpointStore:
+    """Persists per-task xcom outputs so an interrupted pipeline can resume."""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        # a short-lived session per call keeps the store safe to share across threads
+        self.session_factory = session_factory
+
+    def load(self, pipeline_id: str) -> Dict[str, Dict[str, Any]]:
+        """Return the saved outputs of every completed task, keyed by task key."""
+        with self.session_factory() as db:
+            records = db.query(PipelineCheckpoints).filter(
+                PipelineCheckpoints.pipeline_id == pipeline_id).all()
+            return {record.task_key: record.outputs or {} for record in records}
+
+    def save(self, pipeline_id: str, task_key: str, outputs: Dict[str, Any]):
+        """Record a task as completed along with the outputs it produced."""
+        with self.session_factory() as db:
+            record = self._find(db, pipeline_id, task_key)
+            if record:
+                record.outputs = outputs
+                db.commit()
+                return
+            BaseRepository(PipelineCheckpoints, db).create(
+                PipelineCheckpoints(pipeline_id=pipeline_id,
+                                    task_key=task_key,
+                                    outputs=outputs))
+
+    def clear(self, pipeline_id: str, task_key: Optional[str] = None):
+        """Drop the checkpoint of one task, or of the whole pipeline."""
+        with self.session_factory() as db:
+            query = db.query(PipelineCheckpoints).filter(
+                PipelineCheckpoints.pipeline_id == pipeline_id)
+            if task_key is not None:
+                query = query.filter(PipelineCheckpoints.task_key == task_key)
+            query.delete(synchronize_session=False)
+            db.commit()
+
+    def _find(self, db: Session, pipeline_id: str, task_key: str):
+        return db.query(PipelineCheckpoints).filter(
+            PipelineCheckpoints.pipeline_id == pipeline_id,
+            PipelineCheckpoints.task_key == task_key).first()
@@ -1,11 +1,103 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from src.plugins.task_executors import TaskExecutors, WorkTypes, cpu_meter, default_executors
+
+
+class TaskTimeout(Exception):
+    """A task attempt ran past the timeout of its retry policy."""
+
+
+class PipelineSkipped(Exception):
+    """Raised by a task to stop its pipeline early, e.g. for duplicate input.
+    Completed tasks are rolled back, but the run is reported as skipped, not failed."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often a task is attempted, how long each attempt may take and how
+    long to back off in between. The default is one attempt without timeout.
+    Timed out attempts are retried whatever retry_on says."""
+    max_attempts: int = 1
+    backoff: float = 1.0  # delay before the second attempt, in seconds
+    backoff_factor: float = 2.0
+    max_backoff: float = 60.0
+    jitter: float = 0.5  # randomize each delay by up to +/- this fraction
+    timeout: Optional[float] = None  # per attempt, in seconds
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before the attempt following the given (1-based) attempt."""
+        delay = min(self.max_backoff, self.backoff * self.backoff_factor ** (attempt - 1))
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
 
 
 class BaseTask:
+    # xcom keys the task consumes / produces; None means undeclared, which
+    # makes the task a barrier when the pipeline runs in dag mode
+    reads: Optional[Tuple[str, ...]] = None
+    writes: Optional[Tuple[str, ...]] = None
+    # kind of blocking work the task does, see WorkTypes; decides where offload() runs
+    work_type: Optional[str] = None
+    executors: Optional[TaskExecutors] = None  # set by the pipeline
+    # opt into the pipeline's artifact cache; outputs must be a pure function of
+    # cache_inputs() and engine_version, and artifact_keys name the written file paths
+    cacheable: bool = False
+    engine_version: str = "1"
+    artifact_keys: Tuple[str, ...] = ()
+    policy: RetryPolicy = RetryPolicy()
+    stage: Optional[str] = None  # name used in run history, defaults to the class name
+    resource: Optional[str] = None  # pool in the pipeline's ResourcePools held while an attempt runs
+    # side effects rollback() cannot undo, e.g. a published post; the checkpoint
+    # survives a rollback so a re-run restores the task instead of repeating it
+    irreversible: bool = False
+    # a failure only fails this task and the tasks depending on it; siblings keep
+    # running, nothing is rolled back and the run ends partial with checkpoints kept
+    isolated: bool = False
 
-    def __init__(self, name: str):
-        """Initialize the task with a name."""
+    def __init__(self, name: str, reads: Optional[Iterable[str]] = None,
+                 writes: Optional[Iterable[str]] = None):
+        """Initialize the task with a name and optional xcom key declarations."""
         self.name = name
+        if reads is not None:
+            self.reads = tuple(reads)
+        if writes is not None:
+            self.writes = tuple(writes)
+
+    @property
+    def checkpoint_key(self) -> str:
+        """Stable identity of the task inside its pipeline, used for checkpoints."""
+        return type(self).__name__
+
+    def checkpoint_valid(self, outputs: Dict[str, Any]) -> bool:
+        """Override to reject a saved checkpoint, e.g. when an output file is gone."""
+        return True
+
+    def cache_inputs(self, xcom: Dict[str, Any]) -> Dict[str, Any]:
+        """Values the cache key is derived from; defaults to the declared reads."""
+        return {key: xcom.get(key) for key in self.reads or ()}
+
+    def cache_hit(self, xcom: Dict[str, Any]):
+        """Called instead of run() when outputs came from the cache. Optional."""
+        pass
+
+    async def offload(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run blocking work on the pool that matches this task's work type."""
+        executors = self.executors or default_executors()
+        return await executors.submit(self.work_type, fn, *args, **kwargs)
+
+    async def run_subprocess(self, command: List[str], input: Optional[bytes] = None) -> subprocess.CompletedProcess:
+        """Run an external binary through the asyncio subprocess runner."""
+        executors = self.executors or default_executors()
+        return await executors.run_subprocess(command, input=input)
 
     async def run(self, xcom: Dict[str, Any]) -> Any:
         """Override this method to execute the task. Returns data for next task."""
@@ -16,35 +108,472 @@ class BaseTask:
         pass
 
 
+class PipelineModes:
+    sequential = "sequential"
+    dag = "dag"
+
+
+class PipelineStatus:
+    pending = "pending"
+    completed = "completed"
+    failed = "failed"
+    timeout = "timeout"  # the pipeline deadline expired
+    restored = "restored"  # task resumed from a checkpoint
+    cached = "cached"  # task outputs replayed from the artifact cache
+    skipped = "skipped"  # a task stopped the pipeline with PipelineSkipped
+    partial = "partial"  # isolated tasks failed, everything else completed
+
+
+@dataclass
+class TaskReport:
+    name: str
+    status: str = PipelineStatus.pending
+    attempts: int = 0
+    timeouts: int = 0
+    queue_wait: float = 0.0  # seconds spent waiting for a resource pool slot
+    error: Optional[str] = None
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - 1)
+
+
+@dataclass
+class PipelineResult:
+    pipeline_id: Optional[str]
+    status: str = PipelineStatus.pending
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    tasks: Dict[str, TaskReport] = field(default_factory=dict)
+
+    @property
+    def retries(self) -> int:
+        return sum(report.retries for report in self.tasks.values())
+
+    @property
+    def timeouts(self) -> int:
+        return sum(report.timeouts for report in self.tasks.values())
+
+
 class Pipeline:
-    def __init__(self):
-        """Initialize the pipeline with an empty task list and xcom shared storage."""
+    def __init__(self, mode: str = PipelineModes.sequential,
+                 pipeline_id: Optional[str] = None, checkpoints: Any = None,
+                 executors: Optional[TaskExecutors] = None, cache: Any = None,
+                 deadline: Optional[float] = None, history: Any = None,
+                 pools: Any = None):
+        """Initialize the pipeline with an empty task list and xcom shared storage.
+
+        When both pipeline_id and a checkpoint store are given, every completed
+        task is persisted and a re-run of the same pipeline id skips it.
+        Tasks offload blocking work to the given executors, or the process-wide default.
+        Cacheable tasks are served from the artifact cache when one is given.
+        deadline bounds the whole run in seconds, on top of per-task policies.
+        Every task execution is recorded to the run history when one is given.
+        Tasks that name a resource hold a slot of that pool while they run.
+        """
+        self.mode = mode
+        self.deadline = deadline
+        self.history = history
+        self.pools = pools
+        self.executors = executors
+        self.cache = cache
+        self.pipeline_id = pipeline_id
+        self.checkpoints = checkpoints if pipeline_id else None
         self.tasks: List[BaseTask] = []
         self.xcom = {}  # Shared storage
         self.executed_tasks = []  # Track executed tasks for rollback
+        self.restored_tasks: Set[int] = set()  # Indexes resumed from checkpoints
+        self.failed_tasks: Dict[int, str] = {}  # isolated tasks that failed, and their dependents
+        self.started: Optional[float] = None  # monotonic start of the run, the deadline counts from it
+        self.result = PipelineResult(pipeline_id)
 
     def add_task(self, task: BaseTask):
         """Add a task to the pipeline."""
+        if self.executors is not None and task.executors is None:
+            task.executors = self.executors
         self.tasks.append(task)
 
-    async def run(self):
-        """Run the pipeline asynchronously, executing tasks sequentially. Rolls back if any task fails."""
+    async def run(self) -> PipelineResult:
+        """Run the pipeline asynchronously in the configured mode. Rolls back if any task fails."""
+        self.started = time.monotonic()
         try:
-            for task in self.tasks:
-                print(f"Running: {task.name}")
-                result = await task.run(self.xcom)
-                self.xcom[f"{task.name}"] = result  # Store result in xcom
-                self.executed_tasks.append(task)  # Track for rollback
+            await self.resume()
+            await asyncio.wait_for(self._run_mode(), self.deadline)
+            await self.complete()
         except Exception as e:
-            await self.rollback()
-            print("e:", e)
+            await self.abort(e)
+        finally:
+            self.result.elapsed = time.monotonic() - self.started
+        return self.result
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, None when the pipeline has none."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - (time.monotonic() - self.started))
+
+    async def abort(self, error: BaseException):
+        """Record why the run stopped (skipped, deadline or failure) and roll it back."""
+        if isinstance(error, PipelineSkipped):
+            self.result.status = PipelineStatus.skipped
+            self.result.error = str(error)
+        elif isinstance(error, asyncio.TimeoutError) and self.remaining() == 0:
+            self.result.status = PipelineStatus.timeout
+            self.result.error = f"pipeline deadline of {self.deadline}s exceeded"
+        else:
+            self.result.status = PipelineStatus.failed
+            self.result.error = str(error)
+        await self.rollback()
+        print("e:", self.result.error)
+
+    async def _run_mode(self):
+        if self.mode == PipelineModes.dag:
+            await self._run_dag()
+        else:
+            await self._run_sequential()
+
+    def report(self, task: BaseTask) -> TaskReport:
+        """Execution report of a task, created on first access."""
+        if task.checkpoint_key not in self.result.tasks:
+            self.result.tasks[task.checkpoint_key] = TaskReport(task.name)
+        return self.result.tasks[task.checkpoint_key]
+
+    async def _store(self, fn: Callable, *args) -> Any:
+        # checkpoint reads and writes go to sqlite, which post workers and the
+        # tracker share, so they run on the io pool instead of the event loop
+        executors = self.executors or default_executors()
+        return await executors.submit(WorkTypes.io, fn, *args)
+
+    async def resume(self):
+        """Restore xcom from checkpoints of tasks that completed in an earlier run."""
+        if not self.checkpoints:
+            return
+        saved = await self._store(self.checkpoints.load, self.pipeline_id)
+        dependents: Dict[int, Set[int]] = {idx: set() for idx in range(len(self.tasks))}
+        for idx, deps in self.build_graph().items():
+            for dep in deps:
+                dependents[dep].add(idx)
+
+        # latest first: a task whose dependents are all restored is done, even when
+        # they consumed its artifacts (the render deletes the audio it was given) or
+        # its checkpoint was rolled back while an irreversible dependent's was kept
+        restorable: Set[int] = set()
+        for idx in reversed(range(len(self.tasks))):
+            outputs = saved.get(self.tasks[idx].checkpoint_key)
+            if dependents[idx] and dependents[idx] <= restorable:
+                restorable.add(idx)
+            elif outputs is not None and self.tasks[idx].checkpoint_valid(outputs.get("xcom", {})):
+                restorable.add(idx)
+
+        for idx in sorted(restorable):
+            task = self.tasks[idx]
+            outputs = saved.get(task.checkpoint_key) or {}
+            print(f"Resuming: {task.name} ({task.checkpoint_key})")
+            self.xcom.update(outputs.get("xcom", {}))
+            self.xcom[f"{task.name}"] = outputs.get("result")
+            self.restored_tasks.add(idx)
+            self.report(task).status = PipelineStatus.restored
+
+    async def complete(self):
+        """Finalize a run nothing failed in; checkpoints are no longer needed.
+        With failed isolated tasks the run is partial and checkpoints are kept,
+        so a re-run only repeats what failed."""
+        if self.failed_tasks:
+            self.result.status = PipelineStatus.partial
+            self.result.error = "; ".join(f"{self.tasks[idx].name} ({self.tasks[idx].checkpoint_key}): {error}"
+                                          for idx, error in sorted(self.failed_tasks.items()))
+            return
+        self.result.status = PipelineStatus.completed
+        if self.checkpoints:
+            await self._store(self.checkpoints.clear, self.pipeline_id)
+
+    async def run_task(self, idx: int):
+        """Execute a single task by index unless it was restored from a checkpoint."""
+        if idx in self.restored_tasks:
+            return
+        task = self.tasks[idx]
+        if self.failed_tasks and self.build_graph()[idx] & self.failed_tasks.keys():
+            self._fail_dependent(idx)
+            return
+        print(f"Running: {task.name}")
+        before = dict(self.xcom)
+        try:
+            result = await self._execute(task)
+        except Exception as e:
+            if not self._isolate(idx, e):
+                raise
+            return
+        await self._mark_done(task, result, before)
+
+    def _isolate(self, idx: int, error: BaseException) -> bool:
+        """Record the failure of an isolated task instead of failing the pipeline."""
+        task = self.tasks[idx]
+        if not task.isolated or isinstance(error, PipelineSkipped):
+            return False
+        print(f"Isolated failure: {task.name} ({task.checkpoint_key}): {error}")
+        self.failed_tasks[idx] = str(error) or type(error).__name__
+        return True
+
+    def _fail_dependent(self, idx: int):
+        task = self.tasks[idx]
+        print(f"Not running: {task.name} ({task.checkpoint_key}), a task it depends on failed")
+        self.failed_tasks[idx] = "dependency failed"
+        self.report(task).status = PipelineStatus.skipped
+
+    async def _execute(self, task: BaseTask) -> Any:
+        """Run a task and record its timing, cpu and payload sizes to the run history."""
+        if not self.history:
+            return await self._run_cached(task)
+
+        started_at, started = datetime.utcnow(), time.monotonic()
+        input_bytes = payload_size(task.cache_inputs(self.xcom))
+        meter = [0.0]
+        token = cpu_meter.set(meter)
+        error = None
+        try:
+            return await self._run_cached(task)
+        except BaseException as e:
+            error = str(e) or type(e).__name__
+            raise
+        finally:
+            cpu_meter.reset(token)
+            report = self.report(task)
+            if report.status in (PipelineStatus.cached, PipelineStatus.skipped):
+                status = report.status
+            else:
+                status = PipelineStatus.failed if error is not None else PipelineStatus.completed
+            fields = dict(
+                pipeline_id=self.pipeline_id,
+                task_key=task.checkpoint_key,
+                task_name=task.name,
+                stage=task.stage or type(task).__name__,
+                status=status,
+                started_at=started_at,
+                ended_at=datetime.utcnow(),
+                wall_ms=(time.monotonic() - started) * 1000,
+                cpu_ms=None if meter[0] is None else meter[0] * 1000,
+                attempts=report.attempts,
+                wait_ms=report.queue_wait * 1000,
+                input_bytes=input_bytes,
+                output_bytes=payload_size({k: self.xcom.get(k) for k in task.writes or ()}),
+                error=error,
+            )
+            # written from the io pool so recording never blocks or fails the pipeline
+            executors = self.executors or default_executors()
+            executors.io_pool.submit(self._record, fields)
+
+    def _record(self, fields: Dict[str, Any]):
+        try:
+            self.history.record(**fields)
+        except Exception as e:
+            print(f"Could not record run of {fields.get('task_name')}: {e}")
+
+    async def _run_cached(self, task: BaseTask) -> Any:
+        """Run a task, or replay its outputs from the artifact cache."""
+        if not (self.cache and task.cacheable and task.writes is not None):
+            return await self._run_with_policy(task)
+
+        executors = self.executors or default_executors()
+        namespace = type(task).__qualname__
+        key = await executors.submit(WorkTypes.io, self.cache.key, namespace,
+                                     task.engine_version, task.cache_inputs(self.xcom))
+        cached = await executors.submit(WorkTypes.io, self.cache.get, key)
+        if cached is not None:
+            print(f"Cache hit: {task.name} ({namespace})")
+            self.xcom.update(cached["xcom"])
+            task.cache_hit(self.xcom)
+            self.report(task).status = PipelineStatus.cached
+            return cached["result"]
+
+        result = await self._run_with_policy(task)
+        outputs = {"xcom": {k: self.xcom[k] for k in task.writes if k in self.xcom}, "result": result}
+        try:
+            await executors.submit(WorkTypes.io, self.cache.put, key, outputs, task.artifact_keys)
+        except (TypeError, ValueError, OSError) as e:
+            print(f"Not caching {task.name}: {e}")
+        return result
+
+    async def _run_with_policy(self, task: BaseTask) -> Any:
+        """Attempt a task as its retry policy allows, timing out each attempt."""
+        policy, report = task.policy, self.report(task)
+        while True:
+            report.attempts += 1
+            try:
+                # the slot is held per attempt, so backoff sleeps free it for others
+                async with self._slot(task) as waited:
+                    report.queue_wait += waited
+                    result = await self._attempt(task, policy.timeout)
+                report.status, report.error = PipelineStatus.completed, None
+                return result
+            except TaskTimeout as e:
+                report.timeouts += 1
+                error = e
+            except asyncio.CancelledError:
+                report.status, report.error = PipelineStatus.failed, "cancelled"
+                raise
+            except PipelineSkipped as e:
+                report.status, report.error = PipelineStatus.skipped, str(e)
+                raise
+            except policy.retry_on as e:
+                error = e
+            except Exception as e:
+                report.status, report.error = PipelineStatus.failed, str(e)
+                raise
+
+            report.error = str(error)
+            if report.attempts >= policy.max_attempts:
+                report.status = PipelineStatus.failed
+                raise error
+            delay = policy.delay(report.attempts)
+            print(f"Retrying: {task.name} in {delay:.1f}s "
+                  f"(attempt {report.attempts}/{policy.max_attempts}): {error}")
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, task: BaseTask, timeout: Optional[float]) -> Any:
+        """One run of the task; only our own timeout becomes TaskTimeout, a
+        TimeoutError raised inside the task fails the attempt like any error."""
+        if timeout is None:
+            return await task.run(self.xcom)
+        attempt = asyncio.ensure_future(task.run(self.xcom))
+        try:
+            finished, _ = await asyncio.wait({attempt}, timeout=timeout)
+        except asyncio.CancelledError:
+            attempt.cancel()
+            await asyncio.gather(attempt, return_exceptions=True)
+            raise
+        if not finished:
+            # cancelling the attempt also kills children started through run_subprocess
+            attempt.cancel()
+            await asyncio.gather(attempt, return_exceptions=True)
+            raise TaskTimeout(f"{task.name} timed out after {timeout}s")
+        return attempt.result()
+
+    def _slot(self, task: BaseTask):
+        if self.pools is None or task.resource is None:
+            return nullcontext(0.0)
+        return self.pools.slot(task.resource)
+
+    async def _run_sequential(self):
+        """Execute tasks one after another in insertion order."""
+        for idx in range(len(self.tasks)):
+            await self.run_task(idx)
+
+    async def _run_dag(self):
+        """Execute every task whose dependencies are done concurrently."""
+        done: Set[int] = set(self.restored_tasks)
+        waiting = {idx: deps for idx, deps in self.build_graph().items() if idx not in done}
+        running: Dict[asyncio.Future, int] = {}
+        snapshots: Dict[int, Dict[str, Any]] = {}  # xcom as each task saw it on start
+        try:
+            while waiting or running:
+                for idx in [i for i, deps in waiting.items() if deps <= done]:
+                    del waiting[idx]
+                    task = self.tasks[idx]
+                    print(f"Running: {task.name}")
+                    snapshots[idx] = dict(self.xcom)
+                    running[asyncio.ensure_future(self._execute(task))] = idx
+                if not running:
+                    raise RuntimeError(f"unresolvable task dependencies: {sorted(waiting)}")
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                error = None
+                for future in finished:
+                    idx = running.pop(future)
+                    if future.cancelled():
+                        error = error or asyncio.CancelledError()
+                        continue
+                    if future.exception() is not None:
+                        if not self._isolate(idx, future.exception()):
+                            error = error or future.exception()
+                        continue
+                    await self._mark_done(self.tasks[idx], future.result(), snapshots.pop(idx))
+                    done.add(idx)
+                if error:
+                    raise error
+                # whatever waits on a failed isolated task will never run
+                for idx in sorted(waiting):
+                    if waiting[idx] & self.failed_tasks.keys():
+                        del waiting[idx]
+                        self._fail_dependent(idx)
+        except BaseException:
+            # let siblings settle so anything that did finish gets rolled back too
+            for future in running:
+                future.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            for future, idx in running.items():
+                if not future.cancelled() and future.exception() is None:
+                    await self._mark_done(self.tasks[idx], future.result(), snapshots[idx])
+            raise
+
+    def build_graph(self) -> Dict[int, Set[int]]:
+        """Map each task index to the indexes of earlier tasks it has to wait for."""
+        graph = {}
+        for idx, task in enumerate(self.tasks):
+            graph[idx] = {
+                prev for prev in range(idx)
+                if self._conflicts(self.tasks[prev], task)
+            }
+        return graph
+
+    @staticmethod
+    def _conflicts(earlier: BaseTask, later: BaseTask) -> bool:
+        """Two tasks must stay ordered unless both declare keys that do not overlap."""
+        if None in (earlier.reads, earlier.writes, later.reads, later.writes):
+            return True
+        earlier_writes, later_writes = set(earlier.writes), set(later.writes)
+        return bool(earlier_writes & set(later.reads)
+                    or earlier_writes & later_writes
+                    or set(earlier.reads) & later_writes)
+
+    async def _mark_done(self, task: BaseTask, result: Any, before: Dict[str, Any]):
+        """Store a task result in xcom, checkpoint it and track it for rollback."""
+        self.xcom[f"{task.name}"] = result  # Store result in xcom
+        self.executed_tasks.append(task)  # Track for rollback, in completion order
+        if self.checkpoints:
+            await self._checkpoint(task, result, before)
+
+    async def _checkpoint(self, task: BaseTask, result: Any, before: Dict[str, Any]):
+        """Persist what the task wrote; declared writes win over an xcom diff."""
+        if task.writes is not None:
+            written = {key: self.xcom[key] for key in task.writes if key in self.xcom}
+        else:
+            written = {key: value for key, value in self.xcom.items()
+                       if key != task.name and (key not in before or before[key] is not value)}
+        outputs = {"xcom": written, "result": result}
+        try:
+            json.dumps(outputs)
+        except (TypeError, ValueError):
+            print(f"Skipping checkpoint for {task.name}: outputs are not json serializable")
+            return
+        await self._store(self.checkpoints.save, self.pipeline_id, task.checkpoint_key, outputs)
 
     async def rollback(self):
-        """Execute rollback for successfully completed tasks in reverse order."""
+        """Execute rollback for successfully completed tasks in reverse completion order."""
         while self.executed_tasks:
             task = self.executed_tasks.pop()
             print(f"Rolling back: {task.name}")
             await task.rollback(self.xcom)
+            if self.checkpoints and not task.irreversible:
+                await self._store(self.checkpoints.clear, self.pipeline_id, task.checkpoint_key)
+
+
+def payload_size(values: Dict[str, Any]) -> int:
+    """Approximate bytes of xcom values; local files count with their size on disk."""
+    size = 0
+    stack = list(values.values())
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, str):
+            size += len(value.encode())
+            if value.startswith("/") and os.path.isfile(value):
+                size += os.path.getsize(value)
+        elif value is not None:
+            size += len(str(value))
+    return size
 
 
 # Example Task Implementations
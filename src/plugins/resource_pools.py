@@ -0,0 +1,113 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+
+def available_memory_mb() -> Optional[int]:
+    """MemAvailable from /proc/meminfo, or None where it cannot be read."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+@dataclass(frozen=True)
+class PoolSpec:
+    """Slots of a named resource and what one holder costs the host."""
+    limit: int
+    cpus: float = 0.0  # cores one holder keeps busy
+    memory_mb: int = 0  # resident memory of one holder
+
+
+@dataclass
+class PoolStats:
+    limit: int
+    acquired: int = 0
+    in_use: int = 0
+    waiting: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "limit": self.limit,
+            "acquired": self.acquired,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "mean_wait_s": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+            "max_wait_s": round(self.max_wait, 3),
+            "total_wait_s": round(self.total_wait, 3),
+        }
+
+
+class ResourcePools:
+    """Named semaphores tasks hold while an attempt runs.
+
+    Each limit is clamped at construction so that one pool alone never asks
+    for more cores than the host has or more memory than is available right
+    now. Time spent waiting for a slot is tracked per pool, which shows the
+    limit that binds.
+    """
+
+    def __init__(self, specs: Dict[str, PoolSpec],
+                 cpu_count: Optional[int] = None,
+                 memory_mb: Optional[int] = None):
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.memory_mb = memory_mb if memory_mb is not None else available_memory_mb()
+        self.limits = {name: self.check(name, spec) for name, spec in specs.items()}
+        self.semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.limits.items()}
+        self.pool_stats = {name: PoolStats(limit) for name, limit in self.limits.items()}
+
+        cores = sum(self.limits[name] * spec.cpus for name, spec in specs.items())
+        if cores > self.cpu_count:
+            print(f"[pools] all pools full would use {cores:g} cores on {self.cpu_count}, "
+                  f"expect contention")
+
+    def check(self, name: str, spec: PoolSpec) -> int:
+        """Limit of a pool after clamping it to this host's cpus and free memory."""
+        limit = max(1, spec.limit)
+        if spec.cpus > 0:
+            limit = min(limit, max(1, int(self.cpu_count // spec.cpus)))
+        if spec.memory_mb > 0 and self.memory_mb is not None:
+            limit = min(limit, max(1, self.memory_mb // spec.memory_mb))
+        if limit != spec.limit:
+            print(f"[pools] {name}: limit {spec.limit} clamped to {limit} "
+                  f"({self.cpu_count} cpus, {self.memory_mb} MB available)")
+        return limit
+
+    @asynccontextmanager
+    async def slot(self, name: Optional[str]) -> AsyncIterator[float]:
+        """Hold one slot of the named pool; yields the seconds spent waiting.
+        Unknown names are not limited."""
+        semaphore = self.semaphores.get(name)
+        if semaphore is None:
+            yield 0.0
+            return
+
+        stats = self.pool_stats[name]
+        started = time.monotonic()
+        stats.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+        waited = time.monotonic() - started
+        stats.acquired += 1
+        stats.total_wait += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        stats.in_use += 1
+        try:
+            yield waited
+        finally:
+            stats.in_use -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: stats.as_dict() for name, stats in self.pool_stats.items()}
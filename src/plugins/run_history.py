@@ -0,0 +1,65 @@
+import math
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from src.core.models.pipelines import PipelineTaskRuns
+from src.datasource.sqlalchemy.repo import BaseRepository
+from src.datasource.sqlite import SessionLocal
+
+
+class RunHistory:
+    """Pipeline-side recorder that appends task executions to pipeline_task_runs."""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+
+    def record(self, **fields):
+        with self.session_factory() as db:
+            BaseRepository(PipelineTaskRuns, db).create(PipelineTaskRuns(**fields))
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def stage_latency(db: Session, since: datetime, until: Optional[datetime] = None) -> Dict[str, dict]:
+    """p50/p95 wall time and resource wait per stage; cache hits are left out of the latency figures."""
+    query = db.query(
+        PipelineTaskRuns.stage, PipelineTaskRuns.status,
+        PipelineTaskRuns.wall_ms, PipelineTaskRuns.cpu_ms, PipelineTaskRuns.wait_ms).filter(
+            PipelineTaskRuns.started_at >= since)
+    if until is not None:
+        query = query.filter(PipelineTaskRuns.started_at < until)
+
+    grouped: Dict[str, dict] = {}
+    for stage, status, wall_ms, cpu_ms, wait_ms in query.all():
+        bucket = grouped.setdefault(stage, {"wall": [], "cpu": [], "wait": [], "runs": 0, "failed": 0, "cached": 0})
+        bucket["runs"] += 1
+        if status == "failed":
+            bucket["failed"] += 1
+        if status == "cached":
+            bucket["cached"] += 1
+            continue
+        bucket["wall"].append(wall_ms)
+        if cpu_ms is not None:  # null when the stage's cpu could not be metered
+            bucket["cpu"].append(cpu_ms)
+        bucket["wait"].append(wait_ms or 0.0)
+
+    stats = {}
+    for stage, bucket in grouped.items():
+        wall, wait = sorted(bucket["wall"]), sorted(bucket["wait"])
+        stats[stage] = {
+            "runs": bucket["runs"],
+            "failed": bucket["failed"],
+            "cached": bucket["cached"],
+            "p50_ms": percentile(wall, 50),
+            "p95_ms": percentile(wall, 95),
+            "p50_wait_ms": percentile(wait, 50),
+            "p95_wait_ms": percentile(wait, 95),
+            "mean_cpu_ms": round(sum(bucket["cpu"]) / len(bucket["cpu"]), 2) if bucket["cpu"] else None,
+        }
+    return stats
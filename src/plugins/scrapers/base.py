@@ -1,23 +1,31 @@
-import requests
+import asyncio
+import httpx
 from abc import ABC, abstractmethod
-from fake_useragent import UserAgent
+from typing import Optional
+from bs4 import BeautifulSoup, SoupStrainer
+from src.plugins.scrapers.http_cache import HttpCache, default_http_cache
+from src.plugins.scrapers.http_client import HTTP_CLIENTS, USER_AGENTS
+from src.plugins.scrapers.parsing import PARSE_STATS, make_soup
 
 class BaseScraper(ABC):
     """Abstract Base Scraper to define a contract for all scrapers."""
 
+    use_cache = True  # serve and revalidate pages through the shared http cache
+    parser: Optional[str] = None  # see ParserBackends, defaults to lxml when installed
+    parse_only: Optional[SoupStrainer] = None  # subtrees parse() reads, the rest is never built
+
     def __init__(self, base_url: str):
         self.base_url = base_url
         self.headers = self.get_headers()
+        self.cache: HttpCache = default_http_cache() if self.use_cache else None
 
     def get_headers(self):
         """Returns headers to avoid IP bans"""
-        ua = UserAgent()
         return {
-            "User-Agent": ua.random,  # Randomized User-Agent
+            "User-Agent": USER_AGENTS.random(),  # Randomized User-Agent
             "Accept-Language": "en-US,en;q=0.5",  # Language preference
             "Referer": "https://www.google.com",  # Avoid direct referrer issues
             "DNT": "1",  # Do Not Track
-            "Connection": "keep-alive",
         }
 
     @abstractmethod
@@ -25,19 +33,76 @@ class BaseScraper(ABC):
         """Abstract method for parsing data from HTML."""
         pass
 
+    def soup(self, html: str) -> BeautifulSoup:
+        """Tree for parse() built with the scraper's backend and parse_only."""
+        return make_soup(html, self.parser, self.parse_only)
+
+    def timed_parse(self, html: str):
+        """parse() with its duration recorded under the scraper name, see PARSE_STATS."""
+        return PARSE_STATS.timed(type(self).__name__, self.parse, html)
+
     def fetch_page(self, url: str):
-        """Fetches the HTML content of a page."""
+        """Fetches the HTML content of a page over the shared keep-alive client."""
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached and self.cache.fresh(cached):
+            return self.cache.hit(cached)
+        try:
+            response = HTTP_CLIENTS.get(url, {**self.headers, **HttpCache.validators(cached)})
+            return self._cache_response(url, cached, response)
+        except httpx.HTTPError as e:
+            print(f"Request failed: {e}")
+            return None
+
+    async def afetch_page(self, url: str):
+        """Fetches the HTML content of a page without blocking the event loop;
+        cache reads, writes and evictions touch the disk, so they run on a thread."""
+        cached = await asyncio.to_thread(self.cache.lookup, url) if self.cache else None
+        if cached and self.cache.fresh(cached):
+            return self.cache.hit(cached)
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
+            response = await HTTP_CLIENTS.aget(url, {**self.headers, **HttpCache.validators(cached)})
+            return await asyncio.to_thread(self._cache_response, url, cached, response)
+        except httpx.HTTPError as e:
             print(f"Request failed: {e}")
             return None
 
+    def _cache_response(self, url: str, cached: dict, response: httpx.Response) -> str:
+        if cached and response.status_code == 304:
+            return self.cache.not_modified(cached)
+        response.raise_for_status()
+        if self.cache:
+            self.cache.store(url, response.text, response.headers.get("etag"),
+                             response.headers.get("last-modified"))
+        return response.text
+
     def run(self, url: str):
         """Fetch and parse the page."""
         html = self.fetch_page(url)
         if html:
-            return self.parse(html)
+            return self.timed_parse(html)
         return None
+
+    async def arun(self, url: str):
+        """Fetch and parse the page; parsing runs on a thread so other fetches keep going."""
+        html = await self.afetch_page(url)
+        if html:
+            return await asyncio.to_thread(self.timed_parse, html)
+        return None
+
+    async def arun_many(self, urls: list[str]) -> list:
+        """Fetch and parse all urls concurrently; results keep the order of urls."""
+        results = await asyncio.gather(*(self.arun(url) for url in urls), return_exceptions=True)
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                print(f"Scrape failed for {url}: {result}")
+        return [None if isinstance(result, Exception) else result for result in results]
+
+    def run_many(self, urls: list[str]) -> list:
+        """arun_many for synchronous callers; not for use inside a running event loop."""
+        return asyncio.run(self._run_many_and_close(urls))
+
+    async def _run_many_and_close(self, urls: list[str]) -> list:
+        try:
+            return await self.arun_many(urls)
+        finally:
+            await HTTP_CLIENTS.aclose()
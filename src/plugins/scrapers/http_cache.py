@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+home_dir = os.path.expanduser("~")
+
+
+class HttpCacheConfig:
+    CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(home_dir, "ai-agent.httpcache"))
+    MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 256 * 1024 ** 2))
+    # (url regex, seconds a stored page is served without asking the server); first match wins
+    TTL_RULES: Sequence[Tuple[str, float]] = (
+        (r"ndtv\.com/.+-\d{6,}/?$", 12 * 3600),  # published articles, the id is at the end
+        (r"ndtv\.com/latest", 0),  # listing changes every few minutes, always revalidate
+    )
+    DEFAULT_TTL = 0.0
+
+
+class HttpCache:
+    """On-disk cache of page bodies keyed by url.
+
+    A page younger than the ttl of the first matching rule is served without a
+    request. Older pages are revalidated with If-None-Match / If-Modified-Since
+    and a 304 serves the stored body. Entries are single json files, the least
+    recently used ones are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, root: str = HttpCacheConfig.CACHE_DIR,
+                 max_bytes: int = HttpCacheConfig.MAX_BYTES,
+                 rules: Sequence[Tuple[str, float]] = HttpCacheConfig.TTL_RULES,
+                 default_ttl: float = HttpCacheConfig.DEFAULT_TTL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.rules = [(re.compile(pattern), ttl) for pattern, ttl in rules]
+        self.default_ttl = default_ttl
+        self.hits = 0  # served fresh, no request
+        self.revalidated = 0  # 304, body served from disk
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self._index = self._scan()  # key -> (size in bytes, last used)
+
+    def ttl(self, url: str) -> float:
+        for pattern, ttl in self.rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """The stored entry for url, fresh or not, or None."""
+        key = self._key(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            try:
+                with open(self._entry_path(key)) as fp:
+                    entry = json.load(fp)
+            except (OSError, ValueError):
+                self._index.pop(key, None)
+                return None
+            self._index[key] = (self._index[key][0], time.time())
+            return entry
+
+    def fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["stored_at"] < self.ttl(entry["url"])
+
+    @staticmethod
+    def validators(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for a stored entry."""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, entry: Dict[str, Any]) -> str:
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(entry["body"])
+        return entry["body"]
+
+    def not_modified(self, entry: Dict[str, Any]) -> str:
+        """Record a 304: the stored body is current again for another ttl."""
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(entry["body"])
+        entry["stored_at"] = time.time()
+        self._write(entry)
+        return entry["body"]
+
+    def store(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]):
+        with self._lock:
+            self.misses += 1
+        # without a ttl or a validator the entry could never be used
+        if not self.ttl(url) and not (etag or last_modified):
+            return
+        self._write({"url": url, "body": body, "etag": etag,
+                     "last_modified": last_modified, "stored_at": time.time()})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": sum(size for size, _ in self._index.values()),
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.revalidated) / lookups, 3) if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "evictions": self.evictions,
+            }
+
+    def _write(self, entry: Dict[str, Any]):
+        key = self._key(entry["url"])
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staging = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(staging, "w") as fp:
+            json.dump(entry, fp)
+        with self._lock:
+            os.replace(staging, path)
+            self._index[key] = (os.path.getsize(path), time.time())
+            self._evict()
+
+    def _evict(self):
+        total = sum(size for size, _ in self._index.values())
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+            del self._index[key]
+            total -= size
+            self.evictions += 1
+
+    def _scan(self) -> Dict[str, tuple]:
+        index = {}
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith(".json"):
+                    path = os.path.join(shard_dir, name)
+                    index[name[:-5]] = (os.path.getsize(path), os.path.getmtime(path))
+        return index
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    @staticmethod
+    def _key(url: str) -> str:
+        # the fragment never reaches the server
+        return hashlib.sha256(url.split("#")[0].encode()).hexdigest()
+
+
+_default_cache: Optional[HttpCache] = None
+_default_lock = threading.Lock()
+
+
+def default_http_cache() -> HttpCache:
+    """Process-wide cache shared by every scraper, created on first use."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+        return _default_cache
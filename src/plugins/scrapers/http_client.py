@@ -0,0 +1,113 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+FALLBACK_USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                       "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+
+class HttpClientConfig:
+    MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "64"))
+    MAX_PER_HOST = int(os.getenv("SCRAPER_MAX_PER_HOST", "32"))
+    TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "10"))
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  optional, enables http2 in httpx
+        return True
+    except ImportError:
+        return False
+
+
+class UserAgentPool:
+    """fake-useragent's dataset, loaded on first use instead of per scraper."""
+
+    def __init__(self):
+        self._agents = None
+        self._lock = threading.Lock()
+
+    def random(self) -> str:
+        if self._agents is None:
+            with self._lock:
+                if self._agents is None:
+                    try:
+                        from fake_useragent import UserAgent
+                        self._agents = UserAgent()
+                    except Exception as e:
+                        print(f"fake-useragent unavailable, using a fixed user agent: {e}")
+                        self._agents = False
+        return self._agents.random if self._agents else FALLBACK_USER_AGENT
+
+
+class HttpClients:
+    """One pooled keep-alive client per process for blocking callers and one per
+    event loop for async callers, with a cap on requests in flight to one host."""
+
+    def __init__(self, max_connections: int = HttpClientConfig.MAX_CONNECTIONS,
+                 max_per_host: int = HttpClientConfig.MAX_PER_HOST,
+                 timeout: float = HttpClientConfig.TIMEOUT):
+        self.max_per_host = max_per_host
+        self.options = dict(
+            http2=http2_available(),
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+        )
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        # async clients and semaphores belong to the loop they were created on
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_host_slots = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(**self.options)
+            return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = httpx.AsyncClient(**self.options)
+        return client
+
+    def get(self, url: str, headers: dict) -> httpx.Response:
+        host = urlsplit(url).netloc
+        with self._lock:
+            slots = self._host_slots.setdefault(host, threading.BoundedSemaphore(self.max_per_host))
+        with slots:
+            return self.client.get(url, headers=headers)
+
+    async def aget(self, url: str, headers: dict) -> httpx.Response:
+        host = urlsplit(url).netloc
+        loop_slots = self._async_host_slots.setdefault(asyncio.get_running_loop(), {})
+        slots = loop_slots.setdefault(host, asyncio.Semaphore(self.max_per_host))
+        async with slots:
+            return await self.async_client.get(url, headers=headers)
+
+    async def aclose(self):
+        """Close the async client of the running loop, e.g. before the loop shuts down."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+USER_AGENTS = UserAgentPool()
+HTTP_CLIENTS = HttpClients()
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+class ParserBackends:
+    lxml = "lxml"  # C parser, several times faster than html.parser
+    html_parser = "html.parser"  # pure python, always available
+
+
+def default_backend() -> str:
+    try:
+        import lxml  # noqa: F401
+        return ParserBackends.lxml
+    except ImportError:
+        return ParserBackends.html_parser
+
+
+def make_soup(html: str, backend: Optional[str] = None,
+              parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Build a tree with the given backend, keeping only what parse_only matches."""
+    return BeautifulSoup(html, backend or default_backend(), parse_only=parse_only)
+
+
+class ParseStats:
+    """Parse time and input size per scraper."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, dict] = {}
+
+    def record(self, scraper: str, seconds: float, size: int):
+        with self._lock:
+            stats = self._stats.setdefault(scraper, {"pages": 0, "seconds": 0.0, "bytes": 0, "max_ms": 0.0})
+            stats["pages"] += 1
+            stats["seconds"] += seconds
+            stats["bytes"] += size
+            stats["max_ms"] = max(stats["max_ms"], seconds * 1000)
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                scraper: {
+                    "pages": stats["pages"],
+                    "mean_ms": round(stats["seconds"] * 1000 / stats["pages"], 2),
+                    "max_ms": round(stats["max_ms"], 2),
+                    "mb_per_s": round(stats["bytes"] / stats["seconds"] / 1024 ** 2, 2) if stats["seconds"] else None,
+                }
+                for scraper, stats in self._stats.items()
+            }
+
+    def timed(self, scraper: str, parse, html: str):
+        started = time.perf_counter()
+        try:
+            return parse(html)
+        finally:
+            self.record(scraper, time.perf_counter() - started, len(html))
+
+
+PARSE_STATS = ParseStats()
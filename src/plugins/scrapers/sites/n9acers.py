@@ -1,14 +1,16 @@
 from src.plugins.scrapers.base import BaseScraper
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
 class NinetyNineAcresScraper(BaseScraper):
     """Scraper for 99acres"""
 
+    parse_only = SoupStrainer(class_="pageComponent")
+
     def __init__(self):
         super().__init__("https://www.99acres.com")
 
     def parse(self, html: str):
-        soup = BeautifulSoup(html, "html.parser")
+        soup = self.soup(html)
         sections = soup.select(".pageComponent > section")
 
         property_listings = []
@@ -1,15 +1,17 @@
 from src.plugins.scrapers.base import BaseScraper
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
 
 class NdtvNewsScraper(BaseScraper):
     """Scraper for NDTV News Articles"""
 
+    parse_only = SoupStrainer(["h1", "div"], attrs={"itemprop": ["headline", "articleBody"]})
+
     def __init__(self):
         super().__init__("https://www.ndtv.com")
 
     def parse(self, html: str):
-        soup = BeautifulSoup(html, "html.parser")
+        soup = self.soup(html)
 
         # Extract the headline
         el_headline_tag = soup.find("h1", {"itemprop": "headline"})
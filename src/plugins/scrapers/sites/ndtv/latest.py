@@ -1,15 +1,39 @@
 from src.plugins.scrapers.base import BaseScraper
-from bs4 import BeautifulSoup, Comment
+from bs4 import SoupStrainer
 
 
 class NdtvLatestScraper(BaseScraper):
     """Scraper for ndtv latest"""
 
+    parse_only = SoupStrainer("li", class_="NwsLstPg-a-li")
+
     def __init__(self):
         super().__init__("https://www.ndtv.com")
 
+    def page_url(self, page: int) -> str:
+        return f"{self.base_url}/latest" if page == 1 else f"{self.base_url}/latest/page-{page}"
+
+    async def acrawl(self, seen: set[str], max_pages: int = 5) -> list[dict]:
+        """Walk the latest pages newest first until one holds an already seen url.
+
+        Every article of the walked pages is returned, newest first; the caller
+        filters what it processed, so unfinished stories on the last page are
+        offered again.
+        """
+        articles = {}
+        for page in range(1, max_pages + 1):
+            listed = await self.arun(self.page_url(page)) or []
+            for article in listed:
+                articles.setdefault(article["link"], article)
+            if not listed or any(article["link"] in seen for article in listed):
+                break
+        else:
+            if seen:
+                print(f"[crawl] no seen url within {max_pages} pages, older stories were missed")
+        return list(articles.values())
+
     def parse(self, html: str):
-        soup = BeautifulSoup(html, "html.parser")
+        soup = self.soup(html)
         el_articles = soup.select(".NwsLstPg-a-li")
 
         articles = []
@@ -1,29 +1,37 @@
 from src.plugins.scrapers.base import BaseScraper
-from bs4 import BeautifulSoup, Comment
+from bs4 import Comment
 
 
 class NdtvSportsScraper(BaseScraper):
     """Scraper for NDTV News Articles"""
 
+    # story sections are located through their html comments, which a strainer would drop
+    markers = ("Story Headline", "Story Content", "Story Text")
+
     def __init__(self):
         super().__init__("https://www.ndtv.com")
 
     def parse(self, html: str):
-        soup = BeautifulSoup(html, "html.parser")
-        headline_comment = soup.find_all(string=lambda text: isinstance(
-            text, Comment) and "Story Headline" in text)
-        h1_tag = headline_comment[0].find_next_sibling("h1")
+        soup = self.soup(html)
+        # one walk over the document, stopping once the first comment of every marker is seen
+        comments = {}
+        for node in soup.descendants:
+            if not isinstance(node, Comment):
+                continue
+            for marker in self.markers:
+                if marker in node:
+                    comments.setdefault(marker, node)
+            if len(comments) == len(self.markers):
+                break
+
+        h1_tag = comments["Story Headline"].find_next_sibling("h1")
         headline = (h1_tag.text).strip()
 
-        img_tag = soup.find(
-            string=lambda text: isinstance(text, Comment) and "Story Content"
-            in text).find_next("div").find("img")
+        img_tag = comments["Story Content"].find_next("div").find("img")
         media = img_tag["src"]
 
         # Find <!-- Story Text --> comment, go to its parent <div>, and extract all <p> tags
-        story_text_comment = soup.find(string=lambda text: isinstance(
-            text, Comment) and "Story Text" in text)
-        parent_div = story_text_comment.find_parent("div")
+        parent_div = comments["Story Text"].find_parent("div")
         paragraphs = parent_div.find_all("p")
 
         # Extract and print the text of each <p> tag (article links)
@@ -1,5 +1,4 @@
 from src.plugins.scrapers.base import BaseScraper
-from bs4 import BeautifulSoup
 
 
 class OlxEntityScraper(BaseScraper):
@@ -9,7 +8,7 @@ class OlxEntityScraper(BaseScraper):
         super().__init__("https://olx.in")
 
     def parse(self, html: str):
-        soup = BeautifulSoup(html, "html.parser")
+        soup = self.soup(html)
         domtree_el_medias = soup.select(".slick-list img")
 
         medias = [
@@ -0,0 +1,155 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from src.plugins.pipeline_xcavator import BaseTask, Pipeline, PipelineStatus
+
+
+@dataclass
+class Stage:
+    """A named step of the batch; runs every pipeline task of the given types."""
+    name: str
+    task_types: Tuple[Type[BaseTask], ...]
+    workers: int = 1
+
+
+@dataclass
+class StageStats:
+    started_at: float = field(default_factory=time.monotonic)
+    completed: int = 0
+    failed: int = 0  # failed, timed out or partial
+    skipped: int = 0
+    processed: Dict[str, int] = field(default_factory=dict)
+
+    def throughput(self) -> float:
+        """Completed pipelines per hour since the executor started."""
+        elapsed = time.monotonic() - self.started_at
+        return self.completed * 3600 / elapsed if elapsed > 0 else 0.0
+
+
+class StageExecutor:
+    """Runs many pipelines stage by stage with a bounded queue in front of each
+    stage, so scraping one article overlaps rendering and uploading others."""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4, report_interval: int = 60):
+        if not stages:
+            raise ValueError("stage executor needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.stats = StageStats()
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Items waiting in front of every stage."""
+        return {name: queue.qsize() for name, queue in self.queues.items()}
+
+    def report(self) -> Dict[str, Any]:
+        stats = {
+            "completed": self.stats.completed,
+            "failed": self.stats.failed,
+            "skipped": self.stats.skipped,
+            "articles_per_hour": round(self.stats.throughput(), 2),
+            "processed": dict(self.stats.processed),
+            "queue_depths": self.queue_depths(),
+        }
+        print(f"[stages] {stats}")
+        return stats
+
+    def plan(self, pipeline: Pipeline) -> List[List[int]]:
+        """Split the pipeline's task indexes by stage, keeping their original order."""
+        plan = [[] for _ in self.stages]
+        for idx, task in enumerate(pipeline.tasks):
+            for position, stage in enumerate(self.stages):
+                if isinstance(task, stage.task_types):
+                    plan[position].append(idx)
+                    break
+            else:
+                raise ValueError(f"no stage accepts task {type(task).__name__}")
+        return plan
+
+    async def run(self, pipelines: List[Pipeline]):
+        """Push every pipeline through the stages and wait until all of them finish."""
+        self.queues = {stage.name: asyncio.Queue(maxsize=self.queue_size) for stage in self.stages}
+        remaining = len(pipelines)
+        finished = asyncio.Event()
+        if not remaining:
+            return self.report()
+
+        def settle(pipeline: Pipeline):
+            nonlocal remaining
+            pipeline.result.elapsed = time.monotonic() - pipeline.started
+            if pipeline.result.status == PipelineStatus.completed:
+                self.stats.completed += 1
+            elif pipeline.result.status == PipelineStatus.skipped:
+                self.stats.skipped += 1
+            else:
+                self.stats.failed += 1
+            remaining -= 1
+            if remaining == 0:
+                finished.set()
+
+        workers = [
+            asyncio.create_task(self._worker(position, settle))
+            for position, stage in enumerate(self.stages)
+            for _ in range(max(1, stage.workers))
+        ]
+        reporter = asyncio.create_task(self._report_periodically())
+        feeder = asyncio.create_task(self._feed(pipelines, settle))
+        try:
+            await finished.wait()
+        finally:
+            for task in [feeder, reporter, *workers]:
+                task.cancel()
+            await asyncio.gather(feeder, reporter, *workers, return_exceptions=True)
+        return self.report()
+
+    async def _feed(self, pipelines: List[Pipeline], settle):
+        first = self.queues[self.stages[0].name]
+        for pipeline in pipelines:
+            # the deadline covers the whole batch run, time queued between stages included
+            pipeline.started = time.monotonic()
+            try:
+                plan = self.plan(pipeline)
+                await pipeline.resume()
+            except Exception as e:
+                print(f"[stages] cannot schedule pipeline: {e}")
+                await pipeline.abort(e)
+                settle(pipeline)
+                continue
+            await first.put((pipeline, plan))  # blocks while the first stage is saturated
+
+    async def _worker(self, position: int, settle):
+        stage = self.stages[position]
+        queue = self.queues[stage.name]
+        next_queue: Optional[asyncio.Queue] = None
+        if position + 1 < len(self.stages):
+            next_queue = self.queues[self.stages[position + 1].name]
+
+        while True:
+            pipeline, plan = await queue.get()
+            try:
+                for idx in plan[position]:
+                    # an expired deadline stops the pipeline before its next task starts
+                    await asyncio.wait_for(pipeline.run_task(idx), pipeline.remaining())
+                self.stats.processed[stage.name] = self.stats.processed.get(stage.name, 0) + 1
+            except Exception as e:
+                await pipeline.abort(e)
+                print(f"[stages] {stage.name} stopped the pipeline: {pipeline.result.status}")
+                settle(pipeline)
+                continue
+            finally:
+                queue.task_done()
+
+            if next_queue is not None:
+                await next_queue.put((pipeline, plan))
+            else:
+                await pipeline.complete()
+                # partial runs keep their checkpoints and count as failed
+                settle(pipeline)
+
+    async def _report_periodically(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.report()
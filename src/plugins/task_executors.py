@@ -0,0 +1,125 @@
+import asyncio
+import functools
+import os
+import resource
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional
+
+# cpu seconds spent on behalf of the current pipeline task, None once some of it
+# could not be measured; set by the pipeline
+cpu_meter: ContextVar[Optional[List[float]]] = ContextVar("cpu_meter", default=None)
+
+
+def charge_cpu(seconds: Optional[float]):
+    """Add cpu time to the meter of the task that is awaiting the work; None marks it unknown."""
+    meter = cpu_meter.get()
+    if meter is not None and meter[0] is not None:
+        meter[0] = None if seconds is None else meter[0] + seconds
+
+
+def _thread_timed(call: Callable) -> tuple:
+    started = time.thread_time()
+    result = call()
+    return result, time.thread_time() - started
+
+
+def _process_timed(call: Callable) -> tuple:
+    # runs inside the pool worker, so process_time only covers this call
+    started = time.process_time()
+    result = call()
+    return result, time.process_time() - started
+
+
+def _children_cpu() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class WorkTypes:
+    io = "io"  # blocking network / disk calls -> thread pool
+    cpu = "cpu"  # pure python number crunching -> process pool
+    subprocess = "subprocess"  # external binaries -> asyncio subprocesses
+
+
+class TaskExecutors:
+    """Pools that pipeline tasks offload blocking work to, one per kind of work."""
+
+    def __init__(self, io_workers: int = 8, cpu_workers: Optional[int] = None, subprocess_limit: int = 2):
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+        self.subprocess_limit = subprocess_limit
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="task-io")
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._subprocess_slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def cpu_pool(self) -> ProcessPoolExecutor:
+        # created on first use so importing the pipeline never forks workers
+        if self._cpu_pool is None:
+            self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers)
+        return self._cpu_pool
+
+    @property
+    def subprocess_slots(self) -> asyncio.Semaphore:
+        if self._subprocess_slots is None:
+            self._subprocess_slots = asyncio.Semaphore(self.subprocess_limit)
+        return self._subprocess_slots
+
+    async def submit(self, work_type: Optional[str], fn: Callable, *args, **kwargs) -> Any:
+        """Run fn on the pool matching work_type and await its result."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        if work_type == WorkTypes.cpu:
+            result, cpu = await loop.run_in_executor(self.cpu_pool, functools.partial(_process_timed, call))
+        elif work_type == WorkTypes.subprocess:
+            # blocking wrappers around binaries still count against the subprocess limit
+            async with self.subprocess_slots:
+                children = _children_cpu()
+                result, cpu = await loop.run_in_executor(self.io_pool, functools.partial(_thread_timed, call))
+                cpu += _children_cpu() - children
+        else:
+            result, cpu = await loop.run_in_executor(self.io_pool, functools.partial(_thread_timed, call))
+        charge_cpu(cpu)
+        return result
+
+    async def run_subprocess(self, command: List[str], input: Optional[bytes] = None) -> subprocess.CompletedProcess:
+        """Run a binary without blocking the loop; the child is killed if the caller is cancelled."""
+        async with self.subprocess_slots:
+            # rusage of reaped children; approximate when several binaries finish together
+            children = _children_cpu()
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE)
+            try:
+                stdout, stderr = await process.communicate(input)
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+            finally:
+                charge_cpu(_children_cpu() - children)
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+    def shutdown(self, wait: bool = True):
+        self.io_pool.shutdown(wait=wait)
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=wait)
+
+
+_default_executors: Optional[TaskExecutors] = None
+
+
+def default_executors() -> TaskExecutors:
+    """Process-wide executors used by tasks whose pipeline did not get its own."""
+    global _default_executors
+    if _default_executors is None:
+        _default_executors = TaskExecutors()
+    return _default_executors
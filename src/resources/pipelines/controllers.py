@@ -0,0 +1,37 @@
+from fastapi import Depends, APIRouter
+from datetime import datetime, timedelta
+from src.datasource.sqlite import bind_service
+from .models import PipelineTaskRunsSchema
+from .service import PipelineRunsService
+
+router = APIRouter()
+tags = "pipelines"
+
+runs_schema = PipelineTaskRunsSchema(many=True)
+
+
+@router.get("/pipelines/runs", tags=[tags])
+def fetch_task_runs(window_minutes: int = 60,
+                    stage: str = None,
+                    status: str = None,
+                    pipeline_id: str = None,
+                    limit: int = 500,
+                    service: PipelineRunsService = Depends(
+                        bind_service(PipelineRunsService))):
+    since = datetime.utcnow() - timedelta(minutes=window_minutes)
+    records = service.find_runs(since, stage=stage, status=status,
+                                pipeline_id=pipeline_id, limit=limit)
+    return {"status": 200, "data": runs_schema.dump(records)}
+
+
+@router.get("/pipelines/stage-latency", tags=[tags])
+def fetch_stage_latency(window_minutes: int = 60,
+                        service: PipelineRunsService = Depends(
+                            bind_service(PipelineRunsService))):
+    until = datetime.utcnow()
+    since = until - timedelta(minutes=window_minutes)
+    return {
+        "status": 200,
+        "window": {"since": since, "until": until},
+        "data": service.stage_latency(since, until)
+    }
@@ -0,0 +1,8 @@
+from src.core.models.pipelines import PipelineTaskRuns
+from src.datasource.sqlalchemy.schema_base import BaseSchema
+
+
+class PipelineTaskRunsSchema(BaseSchema):
+
+    class Meta(BaseSchema.Meta):
+        model = PipelineTaskRuns
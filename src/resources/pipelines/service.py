@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, List, Optional
+from src.datasource.sqlalchemy.repo import BaseRepository
+from src.core.models.pipelines import PipelineTaskRuns
+from src.plugins.run_history import stage_latency
+
+
+class PipelineRunsService:
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.repository = BaseRepository(PipelineTaskRuns, db)
+
+    def create(self, record: PipelineTaskRuns) -> PipelineTaskRuns:
+        return self.repository.create(record)
+
+    def find_runs(self,
+                  since: datetime,
+                  until: Optional[datetime] = None,
+                  stage: Optional[str] = None,
+                  status: Optional[str] = None,
+                  pipeline_id: Optional[str] = None,
+                  limit: int = 500) -> List[PipelineTaskRuns]:
+        query = self.repository.db.query(PipelineTaskRuns).filter(
+            PipelineTaskRuns.started_at >= since)
+        if until is not None:
+            query = query.filter(PipelineTaskRuns.started_at < until)
+        if stage:
+            query = query.filter(PipelineTaskRuns.stage == stage)
+        if status:
+            query = query.filter(PipelineTaskRuns.status == status)
+        if pipeline_id:
+            query = query.filter(PipelineTaskRuns.pipeline_id == pipeline_id)
+        return query.order_by(PipelineTaskRuns.started_at.desc()).limit(limit).all()
+
+    def stage_latency(self, since: datetime, until: Optional[datetime] = None) -> Dict[str, dict]:
+        return stage_latency(self.db, since, until)
@@ -1,10 +1,17 @@
-from fastapi import Depends, APIRouter
+import asyncio
+import json
+import time
+from typing import Optional
+from fastapi import Depends, APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from src.datasource.sqlite import bind_service
 from pydantic import BaseModel
 from src.core.models.socials import Socials, Platforms
+from src.core.models.posts import PostQueue, PostQueueStages, PostProcessingLogs
+from src.core.queue.post_queue import PostQueueEngine
 from src.core.socials.youtube import YoutubePlatform
 from uuid import UUID
-from dataclasses import asdict
 from .service import SocialsService
 
 router = APIRouter()
@@ -41,20 +48,77 @@ class PostCreate(BaseModel):
     post_body: str
     medias: list[str, str, str, str]
     platform: str
+    dedupe_key: Optional[str] = None
 
 
-@router.post("/tenants/socials/post", tags=[tags], deprecated=True)
-def post_on_social(tenant_id: str,
+post_queue = PostQueueEngine()
+
+
+def queue_status(record: PostQueue, logs: list[PostProcessingLogs] = ()) -> dict:
+    return {
+        "queue_id": str(record.id),
+        "status": record.status,
+        "running": record.status == PostQueueStages.processing and record.lease_owner is not None,
+        "attempts": record.attempts or 0,
+        "logs": [{"status": log.status, "message": log.message} for log in logs],
+    }
+
+
+@router.post("/tenants/socials/post", tags=[tags], status_code=202)
+def post_on_social(tenant_id: UUID,
                    input_dto: PostCreate,
                    service: SocialsService = Depends(
                         bind_service(SocialsService))):
-
-    platform_service = service.get_platform(input_dto.platform, tenant_id)
-    if platform_service:
-        return asdict(
-            platform_service.post(input_dto.post_body,
-                                  media_urls=input_dto.medias))
-    return {"status": 500, "message": "platform down"}
+    """Queue the post; a post worker uploads it and the status endpoints report the outcome."""
+    if input_dto.platform not in service.platforms:
+        raise HTTPException(status_code=400, detail="invalid platform")
+
+    record = post_queue.enqueue(str(tenant_id),
+                                input_dto.model_dump(exclude={"dedupe_key"}),
+                                dedupe_key=input_dto.dedupe_key)
+    return {"queue_id": str(record.id), "status": record.status}
+
+
+async def load_queue_status(queue_id: UUID, tenant_id: UUID) -> dict:
+    # another tenant's entry is reported as missing, never read
+    record = await run_in_threadpool(post_queue.get, str(queue_id), str(tenant_id))
+    if record is None:
+        raise HTTPException(status_code=404, detail="queue entry not found")
+    return queue_status(record, await run_in_threadpool(post_queue.logs, str(queue_id)))
+
+
+@router.get("/tenants/socials/post/{queue_id}", tags=[tags])
+async def get_post_status(queue_id: UUID, tenant_id: UUID, wait: int = 0):
+    """Long poll: with wait > 0, holds the request up to wait seconds (max 60)
+    until the post leaves the processing state."""
+    status = await load_queue_status(queue_id, tenant_id)
+    deadline = time.monotonic() + min(max(wait, 0), 60)
+    while status["status"] == PostQueueStages.processing and time.monotonic() < deadline:
+        await asyncio.sleep(1)
+        status = await load_queue_status(queue_id, tenant_id)
+    return {"status": 200, "data": status}
+
+
+@router.get("/tenants/socials/post/{queue_id}/events", tags=[tags])
+async def stream_post_status(queue_id: UUID, tenant_id: UUID):
+    """Server sent events: one event per status change, closed once the post completes or fails."""
+    status = await load_queue_status(queue_id, tenant_id)
+
+    async def events():
+        current, last = status, None
+        while True:
+            if current != last:
+                yield f"event: status\ndata: {json.dumps(current)}\n\n"
+                last = current
+            else:
+                yield ": keep-alive\n\n"
+            if current["status"] != PostQueueStages.processing:
+                return
+            await asyncio.sleep(2)
+            current = await load_queue_status(queue_id, tenant_id)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
 
 
 @router.get("/tenants/{{tenant_id: str}}/socials/youtube-get-auth-url",
@@ -0,0 +1,253 @@
+"""
+Behaviour checks for the artifact cache (keys, hits, misses, eviction) and the scraper
+http cache (fresh hits, revalidation), no network or binaries needed; pages are served
+from a local http server.
+
+    python tests/cache_checks.py
+    python tests/cache_checks.py --only pipeline_cache_hit
+
+Every check gets its own temporary cache directory. Each check prints ok or FAIL with
+the reason; the script exits non-zero when any check fails.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import contextlib
+import functools
+import io
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory of 'src' to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.plugins.artifact_cache import ArtifactCache
+from src.plugins.pipeline_xcavator import BaseTask, Pipeline, PipelineStatus
+from src.plugins.scrapers.base import BaseScraper
+from src.plugins.scrapers.http_cache import HttpCache
+from src.plugins.scrapers.http_client import HTTP_CLIENTS
+
+CHECKS = {}
+
+
+def check(fn):
+    CHECKS[fn.__name__.removeprefix("check_")] = fn
+    return fn
+
+
+def write_file(directory: str, name: str, content: bytes) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as fp:
+        fp.write(content)
+    return path
+
+
+@check
+def check_key_hashes_file_content(directory):
+    cache = ArtifactCache(os.path.join(directory, "cache"))
+    first = write_file(directory, "a.wav", b"same audio")
+    second = write_file(directory, "b.wav", b"same audio")
+    other = write_file(directory, "c.wav", b"other audio")
+    key = cache.key("VideoGen", "1", {"audio": first})
+    assert key == cache.key("VideoGen", "1", {"audio": second}), "the same content under another path missed"
+    assert key != cache.key("VideoGen", "1", {"audio": other}), "different content shares a key"
+    assert key != cache.key("VideoGen", "2", {"audio": first}), "a new engine version reuses old outputs"
+    assert key != cache.key("AudioGen", "1", {"audio": first}), "tasks share keys"
+
+
+@check
+def check_miss_then_hit(directory):
+    cache = ArtifactCache(os.path.join(directory, "cache"))
+    key = cache.key("AudioGen", "1", {"text": "hello"})
+    assert cache.get(key) is None
+    audio = write_file(directory, "out.wav", b"voiced")
+    assert cache.put(key, {"xcom": {"audio": audio}, "result": None}, ("audio",))
+
+    first = cache.get(key, tmp_dir=directory)
+    second = cache.get(key, tmp_dir=directory)
+    restored = first["xcom"]["audio"]
+    # consumers delete their inputs, so every hit gets its own copy
+    assert restored != audio and restored != second["xcom"]["audio"], (restored, second["xcom"]["audio"])
+    with open(restored, "rb") as fp:
+        assert fp.read() == b"voiced"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1), stats
+
+
+@check
+def check_missing_artifact_is_not_cached(directory):
+    cache = ArtifactCache(os.path.join(directory, "cache"))
+    key = cache.key("AudioGen", "1", {"text": "hello"})
+    assert not cache.put(key, {"xcom": {"audio": os.path.join(directory, "gone.wav")}, "result": None}, ("audio",))
+    assert cache.get(key) is None
+
+
+@check
+def check_lru_eviction(directory):
+    cache = ArtifactCache(os.path.join(directory, "cache"), max_bytes=3000)
+    keys = [cache.key("Summary", "1", {"n": n}) for n in range(3)]
+    for n, key in enumerate(keys):
+        cache.put(key, {"xcom": {"summary": "x" * 1000}, "result": n})
+        if n == 1:
+            cache.get(keys[0])  # the first entry is now more recently used than the second
+    assert cache.get(keys[1]) is None, "the least recently used entry survived"
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+    assert cache.stats()["evictions"] == 1, cache.stats()
+    reopened = ArtifactCache(cache.root, max_bytes=3000)
+    assert reopened.get(keys[2]) is not None, "entries do not survive a restart"
+
+
+class Summarize(BaseTask):
+    reads = ("text",)
+    writes = ("summary",)
+    cacheable = True
+    runs = 0
+
+    async def run(self, xcom):
+        Summarize.runs += 1
+        xcom["summary"] = xcom["text"][:5]
+        return "summarized"
+
+
+class Seed(BaseTask):
+    reads = ()
+    writes = ("text",)
+
+    async def run(self, xcom):
+        xcom["text"] = "a long article"
+
+
+@check
+def check_pipeline_cache_hit(directory):
+    cache = ArtifactCache(os.path.join(directory, "cache"))
+
+    async def run_once():
+        pipeline = Pipeline(cache=cache)
+        pipeline.add_task(Seed("seed"))
+        pipeline.add_task(Summarize("summarize"))
+        result = await pipeline.run()
+        return pipeline, result
+
+    Summarize.runs = 0
+    _, first = asyncio.run(run_once())
+    pipeline, second = asyncio.run(run_once())
+    assert first.tasks["Summarize"].status == PipelineStatus.completed, first.tasks["Summarize"].status
+    assert second.tasks["Summarize"].status == PipelineStatus.cached, second.tasks["Summarize"].status
+    assert Summarize.runs == 1, Summarize.runs
+    assert pipeline.xcom["summary"] == "a lon" and pipeline.xcom["summarize"] == "summarized", pipeline.xcom
+
+
+class PageScraper(BaseScraper):
+    def parse(self, html: str) -> list[dict]:
+        return [{"html": html}]
+
+
+@contextlib.contextmanager
+def page_server(directory: str):
+    """Serves directory on a local port, counting requests and 304 answers; yields the base url."""
+    counts = {"requests": 0, "not_modified": 0}
+
+    class Handler(SimpleHTTPRequestHandler):
+        def send_response(self, code, message=None):
+            counts["requests"] += 1
+            counts["not_modified"] += code == 304
+            super().send_response(code, message)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", counts
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def page_scraper(directory: str, base_url: str, ttl: float) -> PageScraper:
+    scraper = PageScraper(base_url)
+    scraper.cache = HttpCache(os.path.join(directory, "http"), rules=((r"127\.0\.0\.1", ttl),))
+    return scraper
+
+
+def fetch(scraper: PageScraper, url: str, times: int) -> list:
+    async def fetch_all():
+        try:
+            return [await scraper.afetch_page(url) for _ in range(times)]
+        finally:
+            await HTTP_CLIENTS.aclose()
+    return asyncio.run(fetch_all())
+
+
+@check
+def check_http_fresh_hit(directory):
+    write_file(directory, "story.html", b"<html><body>story</body></html>")
+    with page_server(directory) as (base_url, counts):
+        scraper = page_scraper(directory, base_url, ttl=3600)
+        pages = fetch(scraper, f"{base_url}/story.html", 3)
+    assert pages == ["<html><body>story</body></html>"] * 3, pages
+    assert counts["requests"] == 1, counts
+    stats = scraper.cache.stats()
+    assert (stats["hits"], stats["revalidated"], stats["misses"]) == (2, 0, 1), stats
+
+
+@check
+def check_http_revalidation(directory):
+    # no ttl: every fetch asks the server, which answers 304 while the page is unchanged
+    write_file(directory, "latest.html", b"<html><body>latest</body></html>")
+    with page_server(directory) as (base_url, counts):
+        scraper = page_scraper(directory, base_url, ttl=0)
+        pages = fetch(scraper, f"{base_url}/latest.html", 3)
+    assert pages == ["<html><body>latest</body></html>"] * 3, pages
+    assert (counts["requests"], counts["not_modified"]) == (3, 2), counts
+    stats = scraper.cache.stats()
+    assert (stats["hits"], stats["revalidated"], stats["misses"]) == (0, 2, 1), stats
+
+
+@check
+def check_http_sync_fetch_uses_cache(directory):
+    write_file(directory, "story.html", b"<html><body>story</body></html>")
+    with page_server(directory) as (base_url, counts):
+        scraper = page_scraper(directory, base_url, ttl=3600)
+        pages = [scraper.fetch_page(f"{base_url}/story.html") for _ in range(2)]
+    assert pages[0] == pages[1] == "<html><body>story</body></html>", pages
+    assert counts["requests"] == 1, counts
+
+
+@check
+def check_http_uncacheable_page_is_not_stored(directory):
+    cache = HttpCache(os.path.join(directory, "http"), rules=())
+    cache.store("https://example.com/live", "<html></html>", None, None)
+    assert cache.lookup("https://example.com/live") is None, "a page without ttl or validators was stored"
+    cache.store("https://example.com/live", "<html></html>", '"v1"', None)
+    assert cache.lookup("https://example.com/live")["etag"] == '"v1"'
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Behaviour checks for the artifact and http caches")
+    parser.add_argument("--only", action="append", choices=sorted(CHECKS), help="run only these checks")
+    parser.add_argument("--verbose", action="store_true", help="show what the pipelines print")
+    args = parser.parse_args()
+
+    failures = []
+    for name in args.only or CHECKS:
+        output = io.StringIO()
+        try:
+            with tempfile.TemporaryDirectory() as directory, \
+                    contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+                CHECKS[name](directory)
+            print(f"ok    {name}")
+        except AssertionError as e:
+            failures.append(name)
+            print(f"FAIL  {name}: {e}")
+        except Exception as e:
+            failures.append(name)
+            print(f"FAIL  {name}: {type(e).__name__}: {e}")
+
+    if failures:
+        print(f"\nFAILED {len(failures)} of {len(args.only or CHECKS)}")
+        sys.exit(1)
+    print("\nOK")
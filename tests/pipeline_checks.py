@@ -0,0 +1,248 @@
+"""
+Behaviour checks for the pipeline engine (rollback, resume, retries, timeouts), no network,
+binaries or real database needed.
+
+    python tests/pipeline_checks.py
+    python tests/pipeline_checks.py --only rollback_order_dag
+
+Checkpoints go to a throwaway sqlite file. Each check prints ok or FAIL with the
+reason; the script exits non-zero when any check fails.
+"""
+import sys
+import os
+import argparse
+import asyncio
+import contextlib
+import io
+import tempfile
+
+# Add the parent directory of 'src' to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import src.core.models.pipelines  # noqa: F401  registers the checkpoint table
+from src.datasource.sqlalchemy.model_base import BaseModel
+from src.plugins.pipeline_checkpoints import CheckpointStore
+from src.plugins.pipeline_xcavator import (BaseTask, Pipeline, PipelineModes, PipelineSkipped, PipelineStatus,
+                                           RetryPolicy)
+
+CHECKS = {}
+
+
+def check(fn):
+    CHECKS[fn.__name__.removeprefix("check_")] = fn
+    return fn
+
+
+def checkpoint_store(directory: str) -> CheckpointStore:
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'checks.sqlite3db')}")
+    BaseModel.metadata.create_all(bind=engine)
+    return CheckpointStore(sessionmaker(bind=engine))
+
+
+class Step(BaseTask):
+    """Writes its own key after an optional delay; records runs and rollbacks in a shared log."""
+
+    def __init__(self, name: str, log: list, reads=(), delay: float = 0.0, error: Exception = None):
+        super().__init__(name, reads=reads, writes=(name,))
+        self.log = log
+        self.delay = delay
+        self.error = error
+
+    async def run(self, xcom):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        self.log.append(("run", self.name))
+        xcom[self.name] = f"{self.name}-output"
+
+    async def rollback(self, xcom):
+        self.log.append(("rollback", self.name))
+
+    @property
+    def checkpoint_key(self) -> str:
+        return self.name
+
+
+def pipeline(steps: list, **kwargs) -> Pipeline:
+    built = Pipeline(**kwargs)
+    for step in steps:
+        built.add_task(step)
+    return built
+
+
+def rollbacks(log: list) -> list:
+    return [name for action, name in log if action == "rollback"]
+
+
+@check
+async def check_rollback_order_sequential():
+    log = []
+    result = await pipeline([Step("a", log), Step("b", log, reads=("a",)),
+                             Step("c", log, reads=("b",), error=RuntimeError("boom"))]).run()
+    assert result.status == PipelineStatus.failed, result.status
+    assert result.error == "boom", result.error
+    assert rollbacks(log) == ["b", "a"], rollbacks(log)
+
+
+@check
+async def check_rollback_order_dag():
+    # b and c both wait on a; b finishes first, then c fails, so b is undone before a
+    log = []
+    result = await pipeline([Step("a", log), Step("b", log, reads=("a",), delay=0.01),
+                             Step("c", log, reads=("a",), delay=0.05, error=RuntimeError("boom"))],
+                            mode=PipelineModes.dag).run()
+    assert result.status == PipelineStatus.failed, result.status
+    assert rollbacks(log) == ["b", "a"], rollbacks(log)
+
+
+@check
+async def check_skip_rolls_back():
+    log = []
+    result = await pipeline([Step("a", log), Step("b", log, reads=("a",), error=PipelineSkipped("duplicate"))],
+                            mode=PipelineModes.dag).run()
+    assert result.status == PipelineStatus.skipped, result.status
+    assert rollbacks(log) == ["a"], rollbacks(log)
+
+
+@check
+async def check_resume_skips_checkpointed_tasks():
+    with tempfile.TemporaryDirectory() as directory:
+        store = checkpoint_store(directory)
+        log = []
+        failing = Step("c", log, reads=("b",), error=RuntimeError("boom"))
+        upload = Step("b", log, reads=("a",))
+        upload.irreversible = True  # its checkpoint survives the rollback
+        first = await pipeline([Step("a", log), upload, failing], pipeline_id="story", checkpoints=store).run()
+        assert first.status == PipelineStatus.failed, first.status
+        assert set(store.load("story")) == {"b"}, store.load("story")
+
+        # a is done because everything depending on it was restored, so only c runs again
+        log.clear()
+        second = await pipeline([Step("a", log), Step("b", log, reads=("a",)), Step("c", log, reads=("b",))],
+                                pipeline_id="story", checkpoints=store).run()
+        assert second.status == PipelineStatus.completed, second.status
+        assert log == [("run", "c")], log
+        assert second.tasks["b"].status == PipelineStatus.restored, second.tasks["b"].status
+        assert store.load("story") == {}, "checkpoints are cleared once the run completes"
+
+
+@check
+async def check_isolated_failure_is_partial():
+    with tempfile.TemporaryDirectory() as directory:
+        store = checkpoint_store(directory)
+        log = []
+        broken = Step("up_b", log, reads=("video",), error=RuntimeError("quota"))
+        broken.isolated = True
+        result = await pipeline([Step("video", log), Step("up_a", log, reads=("video",)), broken,
+                                 Step("track_b", log, reads=("up_b",))],
+                                mode=PipelineModes.dag, pipeline_id="story", checkpoints=store).run()
+        assert result.status == PipelineStatus.partial, result.status
+        assert rollbacks(log) == [], rollbacks(log)
+        assert result.tasks["track_b"].status == PipelineStatus.skipped, result.tasks["track_b"].status
+        assert set(store.load("story")) == {"video", "up_a"}, store.load("story")
+
+
+class Flaky(BaseTask):
+    """Fails the first failures attempts with error, then succeeds."""
+    reads = ()
+    writes = ("flaky",)
+
+    def __init__(self, name: str, failures: int, error: Exception, policy: RetryPolicy, delay: float = 0.0):
+        super().__init__(name)
+        self.failures = failures
+        self.error = error
+        self.policy = policy
+        self.delay = delay
+        self.calls = 0
+
+    async def run(self, xcom):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise self.error
+        xcom["flaky"] = self.calls
+
+
+@check
+async def check_retry_counts():
+    task = Flaky("flaky", 2, RuntimeError("503"), RetryPolicy(max_attempts=3, backoff=0))
+    result = await pipeline([task]).run()
+    report = result.tasks["Flaky"]
+    assert result.status == PipelineStatus.completed, result.status
+    assert (report.attempts, report.retries, report.timeouts) == (3, 2, 0), (report.attempts, report.retries, report.timeouts)
+    assert result.retries == 2, result.retries
+
+
+@check
+async def check_retries_run_out():
+    task = Flaky("flaky", 5, RuntimeError("503"), RetryPolicy(max_attempts=2, backoff=0))
+    result = await pipeline([task]).run()
+    assert result.status == PipelineStatus.failed, result.status
+    assert task.calls == 2 and result.tasks["Flaky"].attempts == 2, task.calls
+
+
+@check
+async def check_timeout_counts():
+    # every attempt outlives the policy timeout, each one is counted
+    task = Flaky("slow", 0, None, RetryPolicy(max_attempts=2, backoff=0, timeout=0.02), delay=1)
+    result = await pipeline([task]).run()
+    report = result.tasks["Flaky"]
+    assert result.status == PipelineStatus.failed, result.status
+    assert (report.attempts, report.timeouts) == (2, 2), (report.attempts, report.timeouts)
+    assert "timed out" in result.error, result.error
+
+
+@check
+async def check_inner_timeout_is_not_a_task_timeout():
+    # a TimeoutError raised by the task's own work is an ordinary failure
+    task = Flaky("inner", 1, asyncio.TimeoutError("upstream"), RetryPolicy(max_attempts=2, backoff=0, timeout=5))
+    result = await pipeline([task]).run()
+    report = result.tasks["Flaky"]
+    assert result.status == PipelineStatus.completed, result.status
+    assert (report.attempts, report.timeouts) == (2, 0), (report.attempts, report.timeouts)
+
+
+@check
+async def check_no_retry_on_unlisted_errors():
+    task = Flaky("strict", 1, KeyError("bad input"), RetryPolicy(max_attempts=3, backoff=0, retry_on=(OSError,)))
+    result = await pipeline([task]).run()
+    assert result.status == PipelineStatus.failed, result.status
+    assert task.calls == 1, task.calls
+
+
+@check
+async def check_deadline():
+    log = []
+    result = await pipeline([Step("a", log), Step("b", log, reads=("a",), delay=1)], deadline=0.05).run()
+    assert result.status == PipelineStatus.timeout, result.status
+    assert rollbacks(log) == ["a"], rollbacks(log)
+    assert result.elapsed < 0.5, result.elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Behaviour checks for the pipeline engine")
+    parser.add_argument("--only", action="append", choices=sorted(CHECKS), help="run only these checks")
+    parser.add_argument("--verbose", action="store_true", help="show what the pipelines print")
+    args = parser.parse_args()
+
+    failures = []
+    for name in args.only or CHECKS:
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+                asyncio.run(CHECKS[name]())
+            print(f"ok    {name}")
+        except AssertionError as e:
+            failures.append(name)
+            print(f"FAIL  {name}: {e}")
+        except Exception as e:
+            failures.append(name)
+            print(f"FAIL  {name}: {type(e).__name__}: {e}")
+
+    if failures:
+        print(f"\nFAILED {len(failures)} of {len(args.only or CHECKS)}")
+        sys.exit(1)
+    print("\nOK")
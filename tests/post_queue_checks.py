@@ -0,0 +1,210 @@
+"""
+Behaviour checks for the post_queue work queue (leases, reclaim, lost leases, dedupe),
+no platform credentials or real database needed.
+
+    python tests/post_queue_checks.py
+    python tests/post_queue_checks.py --only lease_reclaim
+
+Every check gets a throwaway sqlite file and short leases. Each check prints ok or FAIL
+with the reason; the script exits non-zero when any check fails.
+"""
+import sys
+import os
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+import uuid
+
+# Add the parent directory of 'src' to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.models.posts import PostQueueStages, PostProcessingStatusStages
+from src.core.queue.post_queue import PostQueueEngine
+from src.core.queue.worker import PostWorker
+from src.core.socials.base import PlatformResponse
+from src.datasource.sqlalchemy.model_base import BaseModel
+
+TENANT = str(uuid.uuid4())
+CHECKS = {}
+
+
+def check(fn):
+    CHECKS[fn.__name__.removeprefix("check_")] = fn
+    return fn
+
+
+def queue_engine(directory: str, **kwargs) -> PostQueueEngine:
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'checks.sqlite3db')}",
+                           connect_args={"check_same_thread": False})
+    BaseModel.metadata.create_all(bind=engine)
+    return PostQueueEngine(session_factory=sessionmaker(bind=engine), **kwargs)
+
+
+def statuses(engine: PostQueueEngine, queue_id) -> list:
+    return [log.status for log in engine.logs(str(queue_id))]
+
+
+@check
+def check_claim_is_exclusive(directory):
+    engine = queue_engine(directory)
+    record = engine.enqueue(TENANT, {"platform": "youtube"})
+    first = engine.claim("w1")
+    assert first is not None and first.id == record.id, first
+    assert engine.claim("w2") is None, "a leased row was handed out twice"
+    assert first.attempts == 1, first.attempts
+
+
+@check
+def check_lease_reclaim(directory):
+    engine = queue_engine(directory, lease_seconds=1)
+    record = engine.enqueue(TENANT, {"platform": "youtube"})
+    stale = engine.claim("w1")
+    time.sleep(1.1)
+    assert engine.reclaim_expired() == 1, "the expired lease was not released"
+    fresh = engine.claim("w2")
+    assert fresh is not None and fresh.id == record.id, fresh
+    assert fresh.attempts == 2, fresh.attempts
+    assert not engine.heartbeat(record.id, stale.lease_owner), "the old lease still heartbeats"
+    assert engine.heartbeat(record.id, fresh.lease_owner)
+
+
+@check
+def check_reclaim_fails_after_max_attempts(directory):
+    engine = queue_engine(directory, lease_seconds=1, max_attempts=1)
+    record = engine.enqueue(TENANT, {"platform": "youtube"})
+    engine.claim("w1")
+    time.sleep(1.1)
+    engine.reclaim_expired()
+    assert engine.get(str(record.id)).status == PostQueueStages.failed, engine.get(str(record.id)).status
+    assert engine.claim("w2") is None
+
+
+@check
+def check_lost_lease_is_not_logged_as_success(directory):
+    engine = queue_engine(directory, lease_seconds=1)
+    record = engine.enqueue(TENANT, {"platform": "youtube"})
+    stale = engine.claim("w1")
+    time.sleep(1.1)
+    fresh = engine.claim("w2")
+    assert not engine.complete(record.id, stale.lease_owner), "a lost lease completed the row"
+    assert not engine.fail(record.id, stale.lease_owner, "boom", 1), "a lost lease failed the row"
+    assert PostProcessingStatusStages.success not in statuses(engine, record.id), statuses(engine, record.id)
+    assert engine.get(str(record.id)).status == PostQueueStages.processing
+    assert engine.complete(record.id, fresh.lease_owner)
+    assert statuses(engine, record.id)[-1] == PostProcessingStatusStages.success, statuses(engine, record.id)
+    assert engine.get(str(record.id)).status == PostQueueStages.completed
+
+
+@check
+def check_failure_backs_off_then_fails(directory):
+    engine = queue_engine(directory, max_attempts=2, retry_backoff=1)
+    record = engine.enqueue(TENANT, {"platform": "youtube"})
+
+    def reject(db, job):
+        raise RuntimeError("quota exceeded")
+
+    worker = PostWorker(engine, worker_id="w1", handler=reject)
+    assert worker.run_once()
+    assert not worker.run_once(), "a failed row was retried before its backoff"
+    time.sleep(1.1)
+    assert worker.run_once()
+    assert engine.get(str(record.id)).status == PostQueueStages.failed
+    assert statuses(engine, record.id) == [PostProcessingStatusStages.error, PostProcessingStatusStages.failed], \
+        statuses(engine, record.id)
+
+
+@check
+def check_worker_completes(directory):
+    engine = queue_engine(directory)
+    record = engine.enqueue(TENANT, {"platform": "youtube"})
+    posted = []
+
+    def post(db, job):
+        posted.append(job.id)
+        return PlatformResponse("youtube", "yt-1", {})
+
+    assert PostWorker(engine, worker_id="w1", handler=post).run_once()
+    assert posted == [record.id], posted
+    assert engine.get(str(record.id)).status == PostQueueStages.completed
+
+
+@check
+def check_dedupe_returns_the_pending_row(directory):
+    engine = queue_engine(directory)
+    first = engine.enqueue(TENANT, {"platform": "youtube"}, dedupe_key="youtube:story-1")
+    again = engine.enqueue(TENANT, {"platform": "youtube"}, dedupe_key="youtube:story-1")
+    assert again.id == first.id, "a second row was queued for the same dedupe_key"
+    other = engine.enqueue(str(uuid.uuid4()), {"platform": "youtube"}, dedupe_key="youtube:story-1")
+    assert other.id != first.id, "dedupe leaked across tenants"
+    assert engine.enqueue(TENANT, {"platform": "youtube"}).id != first.id, "rows without a key are never merged"
+
+
+@check
+def check_dedupe_returns_the_completed_row(directory):
+    engine = queue_engine(directory)
+    first = engine.enqueue(TENANT, {"platform": "youtube"}, dedupe_key="youtube:story-1")
+    job = engine.claim("w1", first.id)
+    engine.complete(first.id, job.lease_owner)
+    again = engine.enqueue(TENANT, {"platform": "youtube"}, dedupe_key="youtube:story-1")
+    assert again.id == first.id and again.status == PostQueueStages.completed, (again.id, again.status)
+
+
+@check
+def check_dedupe_requeues_after_failure(directory):
+    engine = queue_engine(directory, max_attempts=1)
+    first = engine.enqueue(TENANT, {"platform": "youtube"}, dedupe_key="youtube:story-1")
+    job = engine.claim("w1", first.id)
+    engine.fail(first.id, job.lease_owner, "quota exceeded", job.attempts)
+    again = engine.enqueue(TENANT, {"platform": "youtube"}, dedupe_key="youtube:story-1")
+    assert again.id != first.id, "a failed post can never be tried again"
+
+
+@check
+def check_claim_by_id(directory):
+    engine = queue_engine(directory)
+    older = engine.enqueue(TENANT, {"platform": "youtube"})
+    target = engine.enqueue(TENANT, {"platform": "youtube"})
+    job = engine.claim("w1", target.id)
+    assert job is not None and job.id == target.id, job
+    assert engine.claim("w2", target.id) is None, "a leased row was claimed by id"
+    assert engine.claim("w2").id == older.id
+
+
+@check
+def check_tenant_scoped_get(directory):
+    engine = queue_engine(directory)
+    record = engine.enqueue(TENANT, {"platform": "youtube"})
+    assert engine.get(str(record.id), TENANT) is not None
+    assert engine.get(str(record.id), str(uuid.uuid4())) is None, "another tenant can read the row"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Behaviour checks for the post_queue work queue")
+    parser.add_argument("--only", action="append", choices=sorted(CHECKS), help="run only these checks")
+    parser.add_argument("--verbose", action="store_true", help="show what the queue prints")
+    args = parser.parse_args()
+
+    failures = []
+    for name in args.only or CHECKS:
+        output = io.StringIO()
+        try:
+            with tempfile.TemporaryDirectory() as directory, \
+                    contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+                CHECKS[name](directory)
+            print(f"ok    {name}")
+        except AssertionError as e:
+            failures.append(name)
+            print(f"FAIL  {name}: {e}")
+        except Exception as e:
+            failures.append(name)
+            print(f"FAIL  {name}: {type(e).__name__}: {e}")
+
+    if failures:
+        print(f"\nFAILED {len(failures)} of {len(args.only or CHECKS)}")
+        sys.exit(1)
+    print("\nOK")
@@ -0,0 +1,156 @@
+"""
+Offline parse benchmark for the site scrapers, run against recorded html in tests/fixtures/html.
+
+    python tests/scraper_benchmark.py                    # report, compare with the saved baseline
+    python tests/scraper_benchmark.py --save-baseline    # record the current numbers as the baseline
+    python tests/scraper_benchmark.py --parser html.parser --only ndtv_latest
+    python tests/scraper_benchmark.py --parser html.parser --no-strainer   # full-document parse, the old way
+
+Every run first checks parse() output against fixtures/html/expected.json, then reports
+pages/sec, peak traced memory of one parse and the memory blocks held by the parse tree.
+Exits non-zero when extraction differs or a metric regresses past --threshold. Baselines
+are machine specific, compare them on the same host.
+"""
+import sys
+import os
+import argparse
+import json
+import time
+import tracemalloc
+
+# Add the parent directory of 'src' to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.plugins.scrapers.sites.ndtv.latest import NdtvLatestScraper
+from src.plugins.scrapers.sites.ndtv.article import NdtvNewsScraper
+from src.plugins.scrapers.sites.ndtv.sports import NdtvSportsScraper
+from src.plugins.scrapers.sites.n9acers import NinetyNineAcresScraper
+from src.plugins.scrapers.sites.olx_entity import OlxEntityScraper
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+BASELINE = os.path.join(os.path.dirname(__file__), "fixtures", "scraper_baseline.json")
+
+CASES = {
+    "ndtv_latest": NdtvLatestScraper,
+    "ndtv_article": NdtvNewsScraper,
+    "ndtv_sports": NdtvSportsScraper,
+    "99acres_listing": NinetyNineAcresScraper,
+    "olx_item": OlxEntityScraper,
+}
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, f"{name}.html"), encoding="utf-8") as fp:
+        return fp.read()
+
+
+def check_extraction(name: str, scraper, html: str, expected: dict) -> list[str]:
+    """Field by field differences between parse() and the recorded expectation."""
+    actual = json.loads(json.dumps(scraper.parse(html)))  # tuples and lists compare alike
+    wanted = expected[name]
+    if isinstance(wanted, list):
+        if len(actual) != len(wanted):
+            return [f"{len(actual)} items, expected {len(wanted)}"]
+        pairs = [(f"[{index}]", a, w) for index, (a, w) in enumerate(zip(actual, wanted))]
+    else:
+        pairs = [("", actual, wanted)]
+
+    problems = []
+    for prefix, actual_item, wanted_item in pairs:
+        for field in sorted(set(actual_item) | set(wanted_item)):
+            if actual_item.get(field) != wanted_item.get(field):
+                problems.append(f"{prefix}.{field}: {str(actual_item.get(field))[:60]!r} "
+                                f"!= {str(wanted_item.get(field))[:60]!r}")
+    return problems
+
+
+def measure(scraper, html: str, iterations: int) -> dict:
+    for _ in range(2):  # warm up imports and caches
+        scraper.parse(html)
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        scraper.parse(html)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    scraper.parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # blocks allocated for the tree itself, measured while it is alive
+    tracemalloc.start()
+    soup = scraper.soup(html)
+    tree_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    del soup
+
+    return {
+        "pages_per_sec": round(iterations / elapsed, 2),
+        "ms_per_page": round(elapsed * 1000 / iterations, 2),
+        "peak_kb": round(peak / 1024, 1),
+        "tree_blocks": tree_blocks,
+    }
+
+
+def regressions(name: str, current: dict, baseline: dict, threshold: float) -> list[str]:
+    found = []
+    if current["pages_per_sec"] < baseline["pages_per_sec"] * (1 - threshold):
+        found.append(f"{name}: {current['pages_per_sec']} pages/sec, baseline {baseline['pages_per_sec']}")
+    for metric in ("peak_kb", "tree_blocks"):
+        if current[metric] > baseline[metric] * (1 + threshold):
+            found.append(f"{name}: {metric} {current[metric]}, baseline {baseline[metric]}")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse benchmark for recorded scraper fixtures")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--parser", default=None, help="force a parser backend, e.g. html.parser or lxml")
+    parser.add_argument("--no-strainer", action="store_true",
+                        help="build the whole document instead of only the parse_only subtrees")
+    parser.add_argument("--only", action="append", choices=sorted(CASES), help="run only these fixtures")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed fractional regression")
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, "expected.json"), encoding="utf-8") as fp:
+        expected = json.load(fp)
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+
+    failures, results = [], {}
+    print(f"{'fixture':<16} {'pages/sec':>10} {'ms/page':>9} {'peak KB':>9} {'tree blocks':>12}")
+    for name in args.only or CASES:
+        scraper = CASES[name]()
+        if args.parser:
+            scraper.parser = args.parser
+        if args.no_strainer:
+            scraper.parse_only = None
+        html = load_fixture(name)
+
+        problems = check_extraction(name, scraper, html, expected)
+        failures.extend(f"{name}{problem}" for problem in problems)
+
+        results[name] = measure(scraper, html, args.iterations)
+        stats = results[name]
+        print(f"{name:<16} {stats['pages_per_sec']:>10} {stats['ms_per_page']:>9} "
+              f"{stats['peak_kb']:>9} {stats['tree_blocks']:>12}"
+              + ("  EXTRACTION MISMATCH" if problems else ""))
+        if name in baseline:
+            failures.extend(regressions(name, stats, baseline[name], args.threshold))
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as fp:
+            json.dump(results, fp, indent=2)
+        print(f"baseline saved to {args.baseline}")
+
+    if failures:
+        print("\nFAILED")
+        for failure in failures:
+            print(" ", failure)
+        sys.exit(1)
+    print("\nOK" + (" (within baseline)" if baseline else " (no baseline to compare)"))